@@ -0,0 +1,58 @@
+import base64
+from typing import Iterable, List
+
+# One byte per question: bit 0 is option A, bit 1 is B, ... bit 7 is H.
+MAX_OPTIONS = 8
+
+
+def letter_bit(letter: str) -> int:
+    position = ord(letter.upper()) - ord("A")
+    if not 0 <= position < MAX_OPTIONS:
+        raise ValueError(f"Option letter out of range A-{chr(ord('A') + MAX_OPTIONS - 1)}: {letter!r}")
+    return 1 << position
+
+
+def letters_to_mask(letters: Iterable[str]) -> int:
+    """
+    "AB" or ["A", "B"] -> 0b11. Separators such as spaces or commas are ignored.
+    """
+    mask = 0
+    for letter in letters:
+        if letter.isalpha():
+            mask |= letter_bit(letter)
+    return mask
+
+
+def mask_to_letters(mask: int) -> str:
+    """
+    0b101 -> "AC"
+    """
+    return "".join(chr(ord("A") + i) for i in range(MAX_OPTIONS) if mask & (1 << i))
+
+
+def encode_answers(masks: List[int]) -> str:
+    """
+    Pack one selection mask per question into a base64 string for the answers Store.
+    Trailing unanswered questions are dropped to keep the payload short.
+    """
+    packed = bytes(masks).rstrip(b"\x00")
+    return base64.b64encode(packed).decode("ascii")
+
+
+def decode_answers(blob: str, n_questions: int = 0) -> List[int]:
+    """
+    Unpack an answers blob back into a list of masks, padded with zeros to n_questions.
+    """
+    masks = list(base64.b64decode(blob)) if blob else []
+    if len(masks) < n_questions:
+        masks.extend([0] * (n_questions - len(masks)))
+    return masks
+
+
+def set_answer(blob: str, index: int, mask: int) -> str:
+    """
+    Return a new blob with question index set to mask.
+    """
+    masks = decode_answers(blob, index + 1)
+    masks[index] = mask
+    return encode_answers(masks)
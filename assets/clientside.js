@@ -0,0 +1,44 @@
+// Browser-side callbacks for dash_app.py.
+// Timer, counter, progress bar and navigation only need the question count,
+// so they run here instead of making a server round trip.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    exam: {
+        // 3 minutes per question, counted down from the exam start timestamp
+        updateTimer: function(n, startedAt, count) {
+            var totalTime = 3 * (count || 0) * 60;
+            var elapsed = startedAt ? Math.floor((Date.now() - startedAt) / 1000) : 0;
+            var timeLeft = Math.max(totalTime - elapsed, 0);
+            var mins = Math.floor(timeLeft / 60);
+            var secs = timeLeft % 60;
+            return String(mins).padStart(2, '0') + ':' + String(secs).padStart(2, '0');
+        },
+
+        updateQuestionCounter: function(index, count) {
+            return 'Question ' + (index + 1) + ' of ' + (count || 0);
+        },
+
+        updateProgress: function(index, count, style) {
+            var progress = count ? (index + 1) / count * 100 : 0;
+            return Object.assign({}, style, {width: progress + '%'});
+        },
+
+        navigate: function(prevClicks, nextClicks, sessionId, index, count) {
+            var triggered = window.dash_clientside.callback_context.triggered;
+            if (!triggered || !triggered.length) {
+                return index;
+            }
+            var buttonId = triggered[0].prop_id.split('.')[0];
+            // A new session (first visit or domain change) starts from the first question
+            if (buttonId === 'session-id') {
+                return 0;
+            }
+            if (buttonId === 'next-btn' && index < count - 1) {
+                return index + 1;
+            }
+            if (buttonId === 'prev-btn' && index > 0) {
+                return index - 1;
+            }
+            return index;
+        }
+    }
+});
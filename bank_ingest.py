@@ -0,0 +1,313 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from answer_codec import MAX_OPTIONS
+from domain_classifier import normalize_domain, parse_domains
+from question_bank import discover_banks
+from question_tokenizer import normalize_answer, option_letters, tokenize_question
+
+# The index lives beside the banks it covers; discover_banks() only picks up CSVs, so it is ignored there.
+INDEX_FILE_NAME = ".bankindex.db"
+# Bump whenever SCHEMA changes; an index of another version is dropped and rebuilt from the banks.
+INDEX_FORMAT_VERSION = 2
+DEFAULT_THRESHOLD = 0.8
+
+# MinHash signature of NUM_PERM 32-bit values, split into BANDS bands of ROWS values for LSH lookup.
+# Two questions share a bucket in some band with probability 1 - (1 - J**ROWS)**BANDS, about 0.99
+# at Jaccard similarity 0.8, so near-duplicates are found without comparing against every question.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, _PRIME, NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, NUM_PERM).astype(np.uint64)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    text_hash TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    path TEXT NOT NULL,
+    bank TEXT NOT NULL,
+    preview TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    added_at REAL NOT NULL,
+    UNIQUE (path, text_hash)
+);
+CREATE INDEX IF NOT EXISTS questions_text_hash ON questions (text_hash);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    question_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket);
+CREATE INDEX IF NOT EXISTS buckets_question ON buckets (question_id);
+CREATE TABLE IF NOT EXISTS indexed_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase, drop punctuation and collapse whitespace, so reformatted copies of a question compare equal.
+    """
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def text_hash(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def minhash(normalized: str) -> np.ndarray:
+    """
+    MinHash signature over overlapping SHINGLE_WORDS-word shingles.
+    """
+    words = normalized.split()
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(len(words) - SHINGLE_WORDS + 1, 1))}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles),
+        dtype=np.uint64, count=len(shingles))
+    # h < 2**32 and a < 2**31, so a * h + b stays inside uint64
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def band_buckets(signature: np.ndarray) -> List[int]:
+    return [int.from_bytes(hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest(),
+                           "big", signed=True)
+            for band in range(BANDS)]
+
+
+class BankIndex:
+    """
+    Persistent near-duplicate index over every question in a bank folder, stored in SQLite.
+
+    A question is a duplicate if its normalized text hash is already indexed, or if an indexed
+    question sharing an LSH bucket has estimated Jaccard similarity >= threshold. Bank files are
+    indexed once and re-read only when their size or mtime changes outside of this index's appends;
+    a re-read file's entries are rebuilt, so deleted or edited rows do not linger.
+    """
+
+    def __init__(self, root: str, db_path: Optional[str] = None, threshold: float = DEFAULT_THRESHOLD):
+        self.root = root
+        self.threshold = threshold
+        self.db_path = db_path or os.path.join(root, INDEX_FILE_NAME)
+        self.conn = sqlite3.connect(self.db_path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_FORMAT_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS questions; DROP TABLE IF EXISTS buckets; "
+                                    "DROP TABLE IF EXISTS indexed_files;")
+            self.conn.execute(f"PRAGMA user_version = {INDEX_FORMAT_VERSION}")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sync(self) -> int:
+        """
+        Index bank files that are new or were changed by something else, replacing a changed file's
+        entries, and drop the entries of files that are gone. Returns the number of files read.
+        """
+        known = {path: (size, mtime) for path, size, mtime in self.conn.execute("SELECT path, size, mtime FROM indexed_files")}
+        read = 0
+        for domain, files in discover_banks(self.root).items():
+            for path in files:
+                stat = os.stat(path)
+                if known.pop(os.path.abspath(path), None) == (stat.st_size, stat.st_mtime):
+                    continue
+                # Rows may have been edited or deleted, not just appended: rebuild the file's entries
+                self._drop(path)
+                with open(path, encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        text = row.get("question") or ""
+                        if text.strip():
+                            self._insert(normalize_text(text), domain, path, text)
+                self.mark_indexed(path)
+                read += 1
+        for path in known:
+            self._drop(path)
+            self.conn.execute("DELETE FROM indexed_files WHERE path = ?", (path,))
+        self.conn.commit()
+        return read
+
+    def find_duplicate(self, text: str) -> Optional[Dict]:
+        """
+        The indexed question text duplicates, as {"kind": "exact"|"near", "similarity", "bank", "preview"}, or None.
+        """
+        normalized = normalize_text(text)
+        row = self.conn.execute("SELECT bank, preview FROM questions WHERE text_hash = ? LIMIT 1",
+                                (text_hash(normalized),)).fetchone()
+        if row:
+            return {"kind": "exact", "similarity": 1.0, "bank": row[0], "preview": row[1]}
+
+        signature = minhash(normalized)
+        candidates = set()
+        for band, bucket in enumerate(band_buckets(signature)):
+            candidates.update(qid for (qid,) in self.conn.execute(
+                "SELECT question_id FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+        best = None
+        for qid in candidates:
+            bank, preview, blob = self.conn.execute(
+                "SELECT bank, preview, signature FROM questions WHERE id = ?", (qid,)).fetchone()
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+            if similarity >= self.threshold and (best is None or similarity > best["similarity"]):
+                best = {"kind": "near", "similarity": similarity, "bank": bank, "preview": preview}
+        return best
+
+    def add(self, text: str, domain: str, bank: str) -> None:
+        self._insert(normalize_text(text), domain, bank, text)
+
+    def _insert(self, normalized: str, domain: str, bank: str, text: str) -> None:
+        signature = minhash(normalized)
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO questions (text_hash, domain, path, bank, preview, signature, added_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (text_hash(normalized), domain, os.path.abspath(bank), os.path.basename(bank), text.strip()[:120],
+             signature.tobytes(), time.time()))
+        if cursor.rowcount:
+            self.conn.executemany("INSERT INTO buckets (band, bucket, question_id) VALUES (?, ?, ?)",
+                                  [(band, bucket, cursor.lastrowid) for band, bucket in enumerate(band_buckets(signature))])
+
+    def _drop(self, path: str) -> None:
+        path = os.path.abspath(path)
+        self.conn.execute("DELETE FROM buckets WHERE question_id IN (SELECT id FROM questions WHERE path = ?)", (path,))
+        self.conn.execute("DELETE FROM questions WHERE path = ?", (path,))
+
+    def mark_indexed(self, path: str) -> None:
+        stat = os.stat(path)
+        self.conn.execute("INSERT OR REPLACE INTO indexed_files (path, size, mtime) VALUES (?, ?, ?)",
+                          (os.path.abspath(path), stat.st_size, stat.st_mtime))
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+
+def bank_path_for(root: str, domain: str) -> str:
+    """
+    The bank file new questions for domain are appended to: the domain's last existing file, or a new
+    file named like the bundled ones, e.g. "domain_Domain 2_ Configuration Management & IaC.csv".
+    """
+    files = discover_banks(root).get(domain)
+    if files:
+        return files[-1]
+    title = next((label for label in parse_domains() if normalize_domain(label) == domain), domain)
+    return os.path.join(root, f"domain_{title.replace(':', '_')}.csv")
+
+
+def append_rows(path: str, rows: List[Tuple[str, str]]) -> None:
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
+    if exists:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b"\n", b"\r")
+    with open(path, mode="a", newline="", encoding="utf-8") as f:
+        if exists and needs_newline:
+            f.write("\n")
+        writer = csv.writer(f)
+        if not exists:
+            writer.writerow(["question", "answer"])
+        writer.writerows(rows)
+
+
+def load_results(path: str) -> List[Dict]:
+    """
+    Extraction results from an image_extractor CSV or .jsonl.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+
+def ingest(results: Iterable[Dict], root: str, threshold: float = DEFAULT_THRESHOLD, dry_run: bool = False) -> Dict:
+    """
+    Append new extracted questions to the per-domain banks under root, skipping exact and near
+    duplicates of questions already in any bank (or earlier in results). Answers are stored as bare
+    option letters; rows whose answer names anything else (e.g. "B. AWS CodeBuild") are rejected, since
+    the app would skip them. Returns a report. results may be a generator: each accepted question is appended to its bank as soon as it
+    arrives, and the index is committed at the end (a crash in between is repaired by the next sync).
+    """
+    report = {"added": {}, "duplicates": [], "rejected": []}
+    os.makedirs(root, exist_ok=True)
+    with BankIndex(root, threshold=threshold) as index:
+        report["files_indexed"] = index.sync()
+        bank_paths: Dict[str, str] = {}
+        for result in results:
+            text = str(result.get("question_and_options") or result.get("question") or "").strip()
+            answer = str(result.get("answer") or "").strip()
+            domain = normalize_domain(result.get("domain_class"))
+            if not text or not answer or not domain:
+                report["rejected"].append({"question": text[:120], "reason": "missing question, answer or domain"})
+                continue
+            options = tokenize_question(text)[1]
+            if not options:
+                report["rejected"].append({"question": text[:120], "reason": "no lettered options"})
+                continue
+            if len(options) > MAX_OPTIONS:
+                report["rejected"].append({"question": text[:120],
+                                           "reason": f"{len(options)} options, at most {MAX_OPTIONS} can be stored"})
+                continue
+            letters = normalize_answer(answer, options)
+            if not letters:
+                report["rejected"].append({"question": text[:120],
+                                           "reason": f"answer {answer[:40]!r} is not a set of the options {option_letters(options)!r}"})
+                continue
+            answer = letters
+            duplicate = index.find_duplicate(text)
+            if duplicate:
+                report["duplicates"].append({"question": text[:120], **duplicate})
+                continue
+            if domain not in bank_paths:
+                bank_paths[domain] = bank_path_for(root, domain)
+            path = bank_paths[domain]
+            index.add(text, domain, path)
+            report["added"][os.path.basename(path)] = report["added"].get(os.path.basename(path), 0) + 1
+            if not dry_run:
+                append_rows(path, [(text, answer)])
+
+        if not dry_run:
+            for path in bank_paths.values():
+                if os.path.exists(path):
+                    # Our own appends: record the new size so the next sync does not re-read the file
+                    index.mark_indexed(path)
+            index.commit()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge extracted questions into the per-domain banks")
+    parser.add_argument("results", nargs="+", help="image_extractor output CSV or .jsonl files")
+    parser.add_argument("--banks-dir", default="domainQuestions", help="folder of per-domain bank CSVs")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="estimated Jaccard similarity at which a question counts as a near duplicate")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be added without writing")
+    args = parser.parse_args()
+
+    rows = [row for path in args.results for row in load_results(path)]
+    report = ingest(rows, args.banks_dir, threshold=args.threshold, dry_run=args.dry_run)
+    for bank, count in report["added"].items():
+        print(f"[SUCCESS] {'Would add' if args.dry_run else 'Added'} {count} questions to {bank}")
+    for dup in report["duplicates"]:
+        print(f"[WARNING] {dup['kind'].capitalize()} duplicate ({dup['similarity']:.2f}) of {dup['bank']}: {dup['question']!r}")
+    for rejected in report["rejected"]:
+        print(f"[WARNING] Rejected ({rejected['reason']}): {rejected['question']!r}")
+    print(f"{sum(report['added'].values())} added, {len(report['duplicates'])} duplicates, "
+          f"{len(report['rejected'])} rejected; {report['files_indexed']} bank files indexed")
@@ -0,0 +1,43 @@
+import os
+import threading
+
+# Set EXAM_BEDROCK_BACKEND=fake to run the extractor against the local FakeBedrock (no AWS calls)
+BACKEND_ENV = "EXAM_BEDROCK_BACKEND"
+
+_client = None
+_lock = threading.Lock()
+
+
+def create_client():
+    """
+    A bedrock-runtime client from the standard AWS credential chain (environment, profile, instance role)
+    and AWS_DEFAULT_REGION, or a FakeBedrock when EXAM_BEDROCK_BACKEND=fake.
+    """
+    if os.getenv(BACKEND_ENV, "").lower() == "fake":
+        from fake_bedrock import FakeBedrock
+        return FakeBedrock.from_env()
+
+    import boto3
+    return boto3.client("bedrock-runtime", region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1'))
+
+
+def get_client():
+    """
+    The shared client, created on first use. Anything with a bedrock-runtime compatible
+    invoke_model(body=, modelId=, accept=, contentType=) returning {'body': <readable>} works.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = create_client()
+    return _client
+
+
+def set_client(client) -> None:
+    """
+    Replace the shared client (None to go back to creating one on next use).
+    """
+    global _client
+    with _lock:
+        _client = client
@@ -0,0 +1,70 @@
+"""
+Answers Store payload: legacy dict-of-letter-lists vs. packed bitmask blob.
+
+For each exam length this reports the JSON bytes sent per callback and the time for one
+update_answers round (decode, set one answer, encode) plus one full scoring pass.
+
+python benchmarks/bench_answer_payload.py
+"""
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_codec import decode_answers, letters_to_mask, set_answer
+
+EXAM_LENGTHS = (20, 75, 200, 1000)
+CHOICES = ["A", "B", "C", "D", "E", "AB", "AD", "BD", "AE", "ACE"]
+
+
+def legacy_update(payload, index, selected):
+    answers = json.loads(payload)
+    answers[str(index)] = list(selected)
+    return json.dumps(answers)
+
+
+def legacy_score(payload, keys):
+    answers = json.loads(payload)
+    return sum(set(answers.get(str(i), [])) == set(key) for i, key in enumerate(keys))
+
+
+def bitmask_update(payload, index, selected):
+    return json.dumps(set_answer(json.loads(payload), index, letters_to_mask(selected)))
+
+
+def bitmask_score(payload, key_masks):
+    masks = decode_answers(json.loads(payload), len(key_masks))
+    return sum(mask == key for mask, key in zip(masks, key_masks))
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'questions':>9} | {'legacy B':>9} {'bitmask B':>9} | "
+          f"{'legacy upd us':>13} {'bitmask upd us':>14} | {'legacy score us':>15} {'bitmask score us':>16}")
+    for n in EXAM_LENGTHS:
+        keys = [rng.choice(CHOICES) for _ in range(n)]
+        key_masks = [letters_to_mask(key) for key in keys]
+        chosen = [rng.choice(CHOICES) for _ in range(n)]
+
+        legacy = json.dumps({str(i): list(c) for i, c in enumerate(chosen)})
+        bitmask = json.dumps(set_answer("", 0, 0))
+        for i, c in enumerate(chosen):
+            bitmask = bitmask_update(bitmask, i, c)
+        assert legacy_score(legacy, keys) == bitmask_score(bitmask, key_masks)
+
+        number = 2000 if n <= 200 else 300
+        timings = [
+            timeit.timeit(lambda: legacy_update(legacy, n // 2, "BD"), number=number),
+            timeit.timeit(lambda: bitmask_update(bitmask, n // 2, "BD"), number=number),
+            timeit.timeit(lambda: legacy_score(legacy, keys), number=number),
+            timeit.timeit(lambda: bitmask_score(bitmask, key_masks), number=number),
+        ]
+        lu, bu, ls, bs = (t / number * 1e6 for t in timings)
+        print(f"{n:>9} | {len(legacy):>9} {len(bitmask):>9} | {lu:>13.1f} {bu:>14.1f} | {ls:>15.1f} {bs:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
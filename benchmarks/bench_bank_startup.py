@@ -0,0 +1,73 @@
+"""
+Startup benchmark: cold CSV parsing vs. warm compiled-bank load.
+
+python benchmarks/bench_bank_startup.py --questions 5000 --repeat 5
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_bank import compile_bank, get_cache_path, load_compiled_bank, parse_questions_from_csv
+
+SAMPLE_BANK = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "domainQuestions", "domain_Domain 1_ SDLC Automation11.csv"
+)
+
+
+def write_synthetic_bank(path, n_questions):
+    # Repeat the real rows so text lengths and option layout match production banks.
+    with open(SAMPLE_BANK, mode='r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    with open(path, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['question', 'answer'])
+        writer.writeheader()
+        for i in range(n_questions):
+            row = rows[i % len(rows)]
+            writer.writerow({'question': f"[{i}] " + row['question'], 'answer': row['answer']})
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bankbench_")
+    try:
+        csv_path = os.path.join(workdir, "domain_Bench.csv")
+        write_synthetic_bank(csv_path, args.questions)
+
+        cold = best_of(lambda: parse_questions_from_csv(csv_path), args.repeat)
+        build = best_of(lambda: (shutil.rmtree(os.path.dirname(get_cache_path(csv_path)), ignore_errors=True),
+                                 compile_bank(csv_path)), args.repeat)
+        warm = best_of(lambda: load_compiled_bank(csv_path), args.repeat)
+
+        print(f"questions:            {args.questions}")
+        print(f"CSV size:             {os.path.getsize(csv_path) / 1024:.1f} KiB")
+        print(f"compiled bank size:   {os.path.getsize(get_cache_path(csv_path)) / 1024:.1f} KiB")
+        print(f"cold CSV parse:       {cold * 1000:.2f} ms")
+        print(f"compile (cold build): {build * 1000:.2f} ms")
+        print(f"warm cache load:      {warm * 1000:.2f} ms")
+        print(f"speedup:              {cold / warm:.1f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Seek vs forward-scan frame capture on a generated slide video.
+
+For each capture interval, times iter_frames() in "seek" mode (CAP_PROP_POS_FRAMES before every read)
+and "scan" mode (grab() forward, retrieve() only at targets), checks both returned the same frames,
+and shows which mode choose_capture_mode() picks for that interval and the probed keyframe spacing.
+Finally fits the cost of one seek in scanned frames, the figure SEEK_OVERHEAD_FRAMES is derived from.
+
+python benchmarks/bench_capture_modes.py --seconds 240 --intervals 1 5 15 60
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_images import (DEFAULT_KEYFRAME_INTERVAL, SEEK_OVERHEAD_FRAMES, choose_capture_mode, iter_frames,
+                            probe_keyframe_interval)
+from video_fixture import make_slide_video
+
+
+def timed_capture(video_path, frame_numbers, mode):
+    video = cv2.VideoCapture(video_path)
+    start = time.perf_counter()
+    frames = [frame for _, frame in iter_frames(video, frame_numbers, mode)]
+    elapsed = time.perf_counter() - start
+    video.release()
+    return elapsed, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", help="use this video instead of generating one")
+    parser.add_argument("--seconds", type=int, default=240, help="length of the generated video")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--intervals", type=float, nargs="+", default=[1, 5, 15, 60],
+                        help="seconds between captures")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="capturebench_")
+    try:
+        video_path = args.video
+        if video_path is None:
+            video_path = os.path.join(workdir, "slides.mp4")
+            make_slide_video(video_path, seconds=args.seconds, fps=args.fps)
+        video = cv2.VideoCapture(video_path)
+        fps = video.get(cv2.CAP_PROP_FPS)
+        total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        video.release()
+        keyframe_interval = probe_keyframe_interval(video_path)
+
+        print(f"video: {total_frames} frames at {fps:.0f} fps, keyframe interval {keyframe_interval or 'unknown'}")
+        print(f"{'interval s':>10} {'captures':>8} {'seek s':>8} {'scan s':>8} {'auto':>5} {'mismatch':>8}")
+        seek_costs, frame_costs = [], []
+        for interval in args.intervals:
+            step = max(int(interval * fps), 1)
+            frame_numbers = list(range(step, total_frames, step))
+            seek_time, seek_frames = timed_capture(video_path, frame_numbers, "seek")
+            scan_time, scan_frames = timed_capture(video_path, frame_numbers, "scan")
+            mismatches = sum(a is None or b is None or not np.array_equal(a, b)
+                             for a, b in zip(seek_frames, scan_frames))
+            print(f"{interval:>10g} {len(frame_numbers):>8} {seek_time:>8.2f} {scan_time:>8.2f} "
+                  f"{choose_capture_mode(frame_numbers, keyframe_interval):>5} {mismatches:>8}")
+            if frame_numbers:
+                seek_costs.append(seek_time / len(frame_numbers))
+                frame_costs.append(scan_time / (frame_numbers[-1] + 1))
+
+        if seek_costs:
+            # One seek costs as much as scanning this many frames; choose_capture_mode models it as
+            # SEEK_OVERHEAD_FRAMES + half a keyframe interval
+            seek_frames = statistics.median(seek_costs) / statistics.median(frame_costs)
+            half_keyint = (keyframe_interval or DEFAULT_KEYFRAME_INTERVAL) / 2
+            print(f"one seek ~ {seek_frames:.0f} scanned frames "
+                  f"({statistics.median(seek_costs) * 1e3:.2f} ms vs {statistics.median(frame_costs) * 1e3:.3f} ms); "
+                  f"implied SEEK_OVERHEAD_FRAMES ~ {seek_frames - half_keyint:.0f} (current {SEEK_OVERHEAD_FRAMES})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Scaling of parallel segmented capture.
+
+Runs capture_specific_times on a generated slide video with 1, 2, 4... worker processes,
+reports wall time, speedup and parallel efficiency, and checks every run wrote the same
+frame_NNN.jpg files as the single-process run.
+
+python benchmarks/bench_capture_parallel.py --seconds 600 --workers 1 2 4 --mode scan
+"""
+import argparse
+import contextlib
+import filecmp
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_images import capture_specific_times
+from video_fixture import make_slide_video
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", help="use this video instead of generating one")
+    parser.add_argument("--seconds", type=int, default=600, help="length of the generated video")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--mode", choices=["auto", "seek", "scan"], default="scan")
+    parser.add_argument("--start-second", type=int, default=15)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="capturebench_")
+    try:
+        video_path = args.video
+        if video_path is None:
+            video_path = os.path.join(workdir, "slides.mp4")
+            make_slide_video(video_path, seconds=args.seconds)
+
+        print(f"CPUs available: {os.cpu_count()}, mode: {args.mode}")
+        print(f"{'workers':>7} {'frames':>6} {'seconds':>8} {'speedup':>8} {'efficiency':>10} {'same files':>10}")
+        baseline = None
+        reference = None
+        for workers in args.workers:
+            output = os.path.join(workdir, f"frames_{workers}")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                captured = capture_specific_times(video_path, output, start_minute=0,
+                                                  start_second=args.start_second, mode=args.mode, workers=workers)
+            elapsed = time.perf_counter() - start
+            names = sorted(os.path.basename(path) for path in captured)
+            if reference is None:
+                baseline, reference = elapsed, (output, names)
+            same = names == reference[1] and all(
+                filecmp.cmp(os.path.join(output, name), os.path.join(reference[0], name), shallow=False)
+                for name in names)
+            print(f"{workers:>7} {len(captured):>6} {elapsed:>8.2f} {baseline / elapsed:>8.2f} "
+                  f"{baseline / elapsed / workers:>10.0%} {str(same):>10}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
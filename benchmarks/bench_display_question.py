@@ -0,0 +1,105 @@
+"""
+Micro-benchmark of display_question latency per question.
+
+Each question is requested twice through the callback endpoint: once as a full render (current-index
+changed) and once as a selection-only update (answers-version changed, served as a Patch). The old
+display_question, which built the whole tree on every call, is registered on a second app with the same
+layout and timed through its own endpoint the same way, so both paths pay the same HTTP and dispatch cost.
+
+python benchmarks/bench_display_question.py --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dash import Dash, Input, Output, dcc, html, no_update
+
+import dash_app
+from answer_codec import decode_answers, letter_bit
+from dash_client import display_question_request, post_callback
+
+
+def legacy_display_question(index, answers_version, session_id):
+    # display_question as it was before fragments were prebuilt: the whole tree on every call
+    session = dash_app.sessions.get(session_id)
+    if session is None:
+        return no_update, no_update, no_update, no_update
+
+    questions = dash_app.registry.get(session["domain"])
+    index = min(index, len(questions) - 1)
+    q = questions[index]
+    selected = decode_answers(session["answers"], index + 1)[index]
+
+    options = []
+    for i, opt in enumerate(q['options']):
+        is_selected = bool(selected & letter_bit(opt[0]))
+        option_style = dash_app.CUSTOM_CSS['option-item'].copy()
+        if is_selected:
+            option_style.update(dash_app.CUSTOM_CSS['option-item-selected'])
+        options.append(html.Label([
+            dcc.Checklist(options=[{'label': '', 'value': opt[0]}], value=[opt[0]] if is_selected else [],
+                          id={'type': 'option', 'index': f'{index}-{i}'}, inputClassName="me-2",
+                          style={'display': 'inline-block'}),
+            html.Span(opt, style={'verticalAlign': 'middle'})
+        ], style=option_style, className="d-flex align-items-center"))
+
+    return f"Q{index + 1}: {q['question']}", options, index == 0, index == len(questions) - 1
+
+
+def legacy_app():
+    app = Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = dash_app.app.layout
+    app.callback(
+        Output('question-text', 'children'),
+        Output('options-container', 'children'),
+        Output('prev-btn', 'disabled'),
+        Output('next-btn', 'disabled'),
+        Input('current-index', 'data'),
+        Input('answers-version', 'data'),
+        Input('session-id', 'data')
+    )(legacy_display_question)
+    return app
+
+
+def timed_request(client, payload, times, sizes):
+    status, elapsed, body, _ = post_callback(client, payload)
+    assert status == 200, status
+    times.append(elapsed)
+    sizes.append(len(body))
+
+
+def median_us(samples):
+    return statistics.median(samples) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--domain", default=dash_app.DEFAULT_DOMAIN)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    questions = dash_app.registry.get(args.domain)
+    session = dash_app.sessions.create(args.domain)
+    clients = {"prebuilt": dash_app.app.server.test_client(), "legacy": legacy_app().server.test_client()}
+
+    times = {(name, kind): [] for name in clients for kind in ("full", "selection")}
+    sizes = {key: [] for key in times}
+    for index in range(len(questions)):
+        for _ in range(args.repeat):
+            for name, client in clients.items():
+                timed_request(client, display_question_request(session["id"], index),
+                              times[name, "full"], sizes[name, "full"])
+                timed_request(client, display_question_request(session["id"], index, 1, changed="answers-version"),
+                              times[name, "selection"], sizes[name, "selection"])
+
+    print(f"questions: {len(questions)}  repeats: {args.repeat}  (median latency via the endpoint)")
+    for (name, kind), samples in times.items():
+        label = f"{name} {'full render' if kind == 'full' else 'selection change'}:"
+        print(f"{label:<30} {median_us(samples):8.1f} us  {statistics.mean(sizes[name, kind]):8.0f} B")
+
+
+if __name__ == "__main__":
+    main()
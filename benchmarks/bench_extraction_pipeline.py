@@ -0,0 +1,102 @@
+"""
+Offline end-to-end benchmark of the image extraction pipeline.
+
+Runs process_images_in_folder over a folder of synthetic images against fake_bedrock.FakeBedrock,
+so no AWS account or network is needed. The fake adds per-call latency and rejects calls beyond
+its capacity with ThrottlingException, so higher concurrency runs into the same contention and
+backoff as a real account quota. Reports images/sec, p95 per-image latency, throttled calls and
+failures for each concurrency x batch size combination.
+
+python benchmarks/bench_extraction_pipeline.py --images 60 --latency 0.2 --capacity 8 --concurrency 1 4 8 16
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction_metrics import ExtractionMetrics
+from fake_bedrock import FakeBedrock
+from image_extractor import process_images_in_folder
+
+
+def write_synthetic_images(folder, count, size):
+    # Random bytes are enough: without preprocessing the pipeline only reads and base64-encodes them
+    for i in range(count):
+        with open(os.path.join(folder, f"frame_{i:03d}.png"), "wb") as f:
+            f.write(os.urandom(size))
+
+
+def run(folder, concurrency, batch_size, args):
+    client = FakeBedrock(latency=args.latency, per_image_latency=args.per_image_latency, jitter=args.jitter,
+                         capacity=args.capacity, throttle_rate=args.throttle_rate,
+                         malformed_rate=args.malformed_rate, seed=args.seed)
+    metrics = ExtractionMetrics()
+    start = time.perf_counter()
+    results = process_images_in_folder(folder, concurrency=concurrency, requests_per_second=args.rps,
+                                       client=client, batch_size=batch_size, metrics=metrics)
+    elapsed = time.perf_counter() - start
+    summary = metrics.summary()
+    return {
+        "concurrency": concurrency,
+        "batch_size": batch_size,
+        "images": len(results),
+        "failed": sum('error' in r for r in results),
+        "seconds": elapsed,
+        "images_per_second": len(results) / elapsed,
+        "p95_image_seconds": summary["seconds"]["total"]["p95"],
+        "retries": summary["retries"],
+        **client.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=60)
+    parser.add_argument("--image-kb", type=int, default=200, help="size of each synthetic image")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model seconds per call")
+    parser.add_argument("--per-image-latency", type=float, default=0.05, help="extra fake seconds per image in a call")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--capacity", type=int, default=8, help="concurrent calls before the fake throttles")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--rps", type=float, help="client-side rate limit, as --rps in image_extractor.py")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="extractbench_")
+    try:
+        write_synthetic_images(workdir, args.images, args.image_kb * 1024)
+        rows = []
+        for batch_size in args.batch_size:
+            for concurrency in args.concurrency:
+                # The pipeline logs every image; keep the benchmark output to the table
+                stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+                try:
+                    rows.append(run(workdir, concurrency, batch_size, args))
+                finally:
+                    sys.stdout.close()
+                    sys.stdout = stdout
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.images} images, fake latency {args.latency}s + {args.per_image_latency}s/image, "
+          f"capacity {args.capacity}")
+    print(f"{'batch':>5} {'conc':>5} {'img/s':>8} {'p95 s':>7} {'calls':>6} {'throttled':>9} {'failed':>6}")
+    for row in rows:
+        print(f"{row['batch_size']:>5} {row['concurrency']:>5} {row['images_per_second']:>8.2f} "
+              f"{row['p95_image_seconds']:>7.2f} {row['calls']:>6} {row['throttled']:>9} {row['failed']:>6}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Frame dedup check on the generated slide video.
+
+Captures a frame every --every seconds from benchmarks/video_fixture.py videos, so every slide is
+captured several times in a row (the blinking cursor makes repeats differ slightly), and runs
+frame_dedup.deduplicate_images on them in capture order. For each hash size it reports the largest
+distance between consecutive frames of one slide and the smallest between consecutive distinct slides.
+For each threshold it counts distinct slides merged into one group (questions that would never be
+extracted) and repeats left in their own group (wasted calls).
+Exits non-zero if frame_dedup.DEFAULT_THRESHOLD merges any distinct slides or misses any repeat.
+
+python benchmarks/bench_frame_dedup.py --sizes 640x360 1280x720 --thresholds 4 6 10 12
+"""
+import argparse
+import bisect
+import os
+import shutil
+import sys
+import tempfile
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_dedup import DEFAULT_THRESHOLD, HASH_SIZE, dhash, deduplicate_images, hamming
+from video_fixture import make_slide_video
+
+
+def capture_frames(video_path, folder, every_seconds, slide_starts):
+    """
+    Write a JPEG every every_seconds; return [(filename, slide index)] in capture order.
+    """
+    video = cv2.VideoCapture(video_path)
+    fps = video.get(cv2.CAP_PROP_FPS)
+    step = max(int(round(every_seconds * fps)), 1)
+    frames = []
+    index = 0
+    while True:
+        ok, frame = video.read()
+        if not ok:
+            break
+        if index % step == 0:
+            filename = f"frame_{len(frames) + 1:04d}.jpg"
+            cv2.imwrite(os.path.join(folder, filename), frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            frames.append((filename, bisect.bisect_right(slide_starts, index / fps) - 1))
+        index += 1
+    video.release()
+    return frames
+
+
+def distances(folder, frames, hash_size):
+    hashes = [dhash(os.path.join(folder, filename), hash_size) for filename, _ in frames]
+    pairs = list(zip(zip(hashes, frames), zip(hashes[1:], frames[1:])))
+    same = [hamming(a, b) for (a, (_, sa)), (b, (_, sb)) in pairs if sa == sb]
+    distinct = [hamming(a, b) for (a, (_, sa)), (b, (_, sb)) in pairs if sa != sb]
+    return max(same, default=0), min(distinct, default=0)
+
+
+def check(folder, frames, threshold):
+    slide_of = dict(frames)
+    representatives, duplicates = deduplicate_images(folder, [filename for filename, _ in frames], threshold)
+    merged = sum(len({slide_of[rep]} | {slide_of[name] for name in duplicates[rep]}) - 1 for rep in representatives)
+    # One group per run of a slide is ideal; every extra group is a repeat that was not collapsed
+    runs = 1 + sum(a[1] != b[1] for a, b in zip(frames, frames[1:]))
+    missed = len(representatives) + merged - runs
+    return len(representatives), runs, merged, missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=120)
+    parser.add_argument("--sizes", nargs="+", default=["640x360", "1280x720"])
+    parser.add_argument("--every", type=float, default=0.5, help="capture interval in seconds")
+    parser.add_argument("--thresholds", type=int, nargs="+", default=[4, 6, 10, 12])
+    args = parser.parse_args()
+
+    failed = False
+    workdir = tempfile.mkdtemp(prefix="dedupbench_")
+    try:
+        for size in args.sizes:
+            width, height = (int(v) for v in size.split("x"))
+            folder = os.path.join(workdir, size)
+            os.makedirs(folder)
+            video_path = os.path.join(folder, "slides.mp4")
+            slide_starts = make_slide_video(video_path, seconds=args.seconds, width=width, height=height)
+            frames = capture_frames(video_path, folder, args.every, slide_starts)
+
+            print(f"{size}: {len(frames)} frames of {len(slide_starts)} slides")
+            for hash_size in sorted({8, HASH_SIZE}):
+                same, distinct = distances(folder, frames, hash_size)
+                print(f"  {hash_size * hash_size:>3}-bit hash: repeats up to {same} bits apart, "
+                      f"distinct slides at least {distinct} bits apart")
+            print(f"  {'threshold':>9} {'groups':>6} {'ideal':>6} {'merged':>6} {'missed':>6}")
+            for threshold in sorted(set(args.thresholds) | {DEFAULT_THRESHOLD}):
+                groups, runs, merged, missed = check(folder, frames, threshold)
+                print(f"  {threshold:>9} {groups:>6} {runs:>6} {merged:>6} {missed:>6}")
+                if threshold == DEFAULT_THRESHOLD and (merged or missed):
+                    failed = True
+                    print(f"[FAIL] threshold {threshold}: {merged} distinct slides merged, {missed} repeats missed")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
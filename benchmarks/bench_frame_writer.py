@@ -0,0 +1,75 @@
+"""
+Inline vs background frame writing during capture.
+
+Captures every Nth frame of a generated 720p slide video with capture_segment(), writing frames
+inline (writer threads 0, the old cv2.imwrite behaviour) or through the FrameWriter pool, for each
+output format. Reports wall time, decode time, encode and write time, time decoding was blocked by
+the bounded queue, output size and peak RSS.
+
+python benchmarks/bench_frame_writer.py --seconds 60 --every 5 --threads 0 2 --formats jpeg png webp
+"""
+import argparse
+import contextlib
+import io
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_images import capture_segment
+from video_fixture import make_slide_video
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--every", type=int, default=5, help="capture every Nth frame")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--formats", nargs="+", default=["jpeg", "png", "webp"])
+    parser.add_argument("--quality", type=int, default=90)
+    parser.add_argument("--queue", type=int, default=8)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="writerbench_")
+    try:
+        video_path = os.path.join(workdir, "slides.mp4")
+        make_slide_video(video_path, seconds=args.seconds, width=args.width, height=args.height)
+        video = cv2.VideoCapture(video_path)
+        total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = video.get(cv2.CAP_PROP_FPS)
+        video.release()
+        targets = [(idx, frame_number / fps, frame_number)
+                   for idx, frame_number in enumerate(range(0, total_frames, args.every))]
+
+        print(f"{len(targets)} frames captured from {total_frames} ({args.width}x{args.height}), queue {args.queue}")
+        print(f"{'format':>6} {'threads':>7} {'wall s':>7} {'decode s':>8} {'encode s':>8} {'write s':>7} "
+              f"{'blocked s':>9} {'MB':>6} {'peak RSS MB':>11}")
+        for image_format in args.formats:
+            for threads in args.threads:
+                output = os.path.join(workdir, f"{image_format}_{threads}")
+                os.makedirs(output)
+                options = {"image_format": image_format, "quality": args.quality, "threads": threads,
+                           "max_queue": args.queue}
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    _, timings = capture_segment(video_path, output, 0, targets, "scan", options)
+                elapsed = time.perf_counter() - start
+                peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                print(f"{image_format:>6} {threads:>7} {elapsed:>7.2f} {timings['decode_seconds']:>8.2f} "
+                      f"{timings['encode_seconds']:>8.2f} {timings['write_seconds']:>7.2f} "
+                      f"{timings['blocked_seconds']:>9.2f} {timings['bytes'] / 1e6:>6.1f} {peak_mb:>11.0f}")
+                shutil.rmtree(output)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Scene-change capture vs the fixed capture schedule on a generated slide video.
+
+The generated video has slides of known start times and varying length (2-15 s). For scene-change
+capture and for fixed schedules of several intervals, reports frames saved (= extraction calls),
+distinct slides covered, slides missed and duplicate frames. Also reports how much faster than
+real time the scene-change pass ran.
+
+python benchmarks/bench_scene_capture.py --seconds 600 --width 1280 --height 720
+"""
+import argparse
+import bisect
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_images import capture_slides
+from video_fixture import make_slide_video
+
+
+def coverage(times, slide_starts):
+    slides = [bisect.bisect_right(slide_starts, t) - 1 for t in times]
+    distinct = len(set(slides))
+    return {"frames": len(times), "slides": distinct, "missed": len(slide_starts) - distinct,
+            "duplicates": len(times) - distinct}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=600)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--intervals", type=float, nargs="+", default=[5, 15, 60], help="fixed schedules to compare, seconds")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="scenebench_")
+    try:
+        video_path = os.path.join(workdir, "slides.mp4")
+        slide_starts = make_slide_video(video_path, seconds=args.seconds, fps=args.fps, width=args.width, height=args.height)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            saved = capture_slides(video_path, os.path.join(workdir, "slides"))
+        elapsed = time.perf_counter() - start
+
+        print(f"{args.seconds}s video, {args.width}x{args.height} at {args.fps} fps, {len(slide_starts)} slides")
+        print(f"scene-change pass: {elapsed:.2f}s ({args.seconds / elapsed:.1f}x real time)")
+        print(f"{'capture':<16} {'frames':>6} {'slides':>6} {'missed':>6} {'duplicates':>10}")
+        rows = [("scene change", coverage([t for _, t in saved], slide_starts))]
+        for interval in args.intervals:
+            times = [t * interval for t in range(1, int(args.seconds / interval) + 1) if t * interval < args.seconds]
+            rows.append((f"every {interval:g}s", coverage(times, slide_starts)))
+        for name, row in rows:
+            print(f"{name:<16} {row['frames']:>6} {row['slides']:>6} {row['missed']:>6} {row['duplicates']:>10}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
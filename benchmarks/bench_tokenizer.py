@@ -0,0 +1,106 @@
+"""
+Question tokenizer: correctness corpus and throughput benchmark.
+
+Checks tokenize_question against benchmarks/tokenizer_corpus.json and against the real banks,
+then times it and the old two-regex splitter over a large synthetic bank.
+Exits non-zero if any corpus case fails.
+
+python benchmarks/bench_tokenizer.py --questions 50000
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from question_tokenizer import tokenize_question
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tokenizer_corpus.json")
+
+
+def regex_split(text):
+    # The original extract_question_and_options (options A-E only)
+    match = re.split(r'\n(?=[A-E]\.)', text, maxsplit=1)
+    if len(match) == 2:
+        question_part, options_part = match
+    else:
+        question_part, options_part = text, ""
+    options = re.findall(r'([A-E]\..*?)(?=\n[A-E]\.|$)', options_part, re.DOTALL)
+    return question_part, options
+
+
+def check_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = json.load(f)
+    failures = 0
+    for case in corpus:
+        question, options = tokenize_question(case["text"])
+        if question != case["question"] or options != case["options"]:
+            failures += 1
+            print(f"[FAIL] {case['name']}: got {(question, options)!r}")
+    print(f"corpus: {len(corpus) - failures}/{len(corpus)} cases passed")
+    return failures
+
+
+def check_banks():
+    # On the real banks the tokenizer must agree with the old splitter up to trailing whitespace
+    mismatches, total = 0, 0
+    for path in glob.glob(os.path.join(ROOT, "domainQuestions", "*.csv")):
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                total += 1
+                old_q, old_o = regex_split(row["question"])
+                new_q, new_o = tokenize_question(row["question"])
+                if old_q != new_q or [o.rstrip() for o in old_o] != new_o:
+                    mismatches += 1
+    print(f"banks: {total - mismatches}/{total} questions agree with the regex splitter")
+    return mismatches
+
+
+def synthetic_bank(n, rng):
+    words = "deploy pipeline artifact bucket lambda canary rollback stack region account role".split()
+    bank = []
+    for _ in range(n):
+        stem = " ".join(rng.choice(words) for _ in range(rng.randint(40, 120)))
+        n_options = rng.randint(4, 7)
+        options = [f"{chr(65 + i)}. " + " ".join(rng.choice(words) for _ in range(rng.randint(10, 40)))
+                   for i in range(n_options)]
+        bank.append(stem + "\n" + "\n".join(options))
+    return bank
+
+
+def throughput(fn, bank):
+    start = time.perf_counter()
+    for text in bank:
+        fn(text)
+    elapsed = time.perf_counter() - start
+    size_mb = sum(len(t) for t in bank) / 1e6
+    return len(bank) / elapsed, size_mb / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=50000)
+    args = parser.parse_args()
+
+    failures = check_corpus()
+    check_banks()
+
+    bank = synthetic_bank(args.questions, random.Random(0))
+    truncated = sum(len(regex_split(t)[1]) < len(tokenize_question(t)[1]) for t in bank)
+    for name, fn in (("regex split (A-E)", regex_split), ("single-pass tokenizer", tokenize_question)):
+        qps, mbps = throughput(fn, bank)
+        print(f"{name:<22} {qps:>10.0f} questions/s {mbps:>8.1f} MB/s")
+    print(f"questions with F/G options truncated by the regex split: {truncated}/{len(bank)}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
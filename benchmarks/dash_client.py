@@ -0,0 +1,121 @@
+"""
+Helpers to call dash_app callbacks in-process through Flask's test client,
+using the same JSON payload the Dash renderer posts to /_dash-update-component.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+UPDATE_URL = "/_dash-update-component"
+
+
+def prop_id(component_id, prop):
+    # Pattern-matching ids are serialised the way the renderer does it: sorted keys, no spaces
+    if isinstance(component_id, dict):
+        component_id = json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+    return f"{component_id}.{prop}"
+
+
+def _dependency(item):
+    # (id, prop, value) -> renderer dict; a list of those is a pattern-matching (ALL) input
+    if isinstance(item, list):
+        return [_dependency(i) for i in item]
+    component_id, prop, value = item
+    return {"id": component_id, "property": prop, "value": value}
+
+
+def callback_request(outputs, inputs, state=(), changed=()):
+    """
+    Build an update-component payload.
+    outputs: [(id, prop)]; inputs/state: [(id, prop, value)] or lists of those for ALL inputs;
+    changed: [(id, prop)] that triggered the callback.
+    """
+    if len(outputs) == 1:
+        output = prop_id(*outputs[0])
+        outputs_spec = {"id": outputs[0][0], "property": outputs[0][1]}
+    else:
+        output = ".." + "...".join(prop_id(*o) for o in outputs) + ".."
+        outputs_spec = [{"id": o[0], "property": o[1]} for o in outputs]
+    return {
+        "output": output,
+        "outputs": outputs_spec,
+        "inputs": [_dependency(i) for i in inputs],
+        "state": [_dependency(s) for s in state],
+        "changedPropIds": [prop_id(*c) for c in changed],
+    }
+
+
+def post_callback(client, payload):
+    """
+    POST one callback. Returns (status code, seconds, response bytes, response json or None).
+    """
+    body = json.dumps(payload)
+    start = time.perf_counter()
+    response = client.post(UPDATE_URL, data=body, content_type="application/json")
+    elapsed = time.perf_counter() - start
+    data = response.get_data()
+    parsed = json.loads(data) if response.status_code == 200 and data else None
+    return response.status_code, elapsed, data, parsed
+
+
+# Payloads for the dash_app.py callbacks
+
+DISPLAY_OUTPUTS = [("question-text", "children"), ("options-container", "children"),
+                   ("prev-btn", "disabled"), ("next-btn", "disabled")]
+
+
+def display_question_request(session_id, index, answers_version=0, changed="current-index"):
+    changed_prop = {"current-index": ("current-index", "data"),
+                    "answers-version": ("answers-version", "data"),
+                    "session-id": ("session-id", "data")}[changed]
+    return callback_request(
+        DISPLAY_OUTPUTS,
+        [("current-index", "data", index), ("answers-version", "data", answers_version),
+         ("session-id", "data", session_id)],
+        changed=[changed_prop],
+    )
+
+
+def update_answers_request(session_id, index, n_options, selected_letters):
+    option_values = [
+        ({"type": "option", "index": f"{index}-{i}"}, "value",
+         [chr(ord("A") + i)] if chr(ord("A") + i) in selected_letters else [])
+        for i in range(n_options)
+    ]
+    clicked = {"type": "option", "index": f"{index}-{ord(selected_letters[0]) - ord('A') if selected_letters else 0}"}
+    return callback_request(
+        [("answers-version", "data")],
+        [option_values],
+        state=[("current-index", "data", index), ("session-id", "data", session_id)],
+        changed=[(clicked, "value")],
+    )
+
+
+def start_session_request(domain, session_id=None):
+    return callback_request(
+        [("session-id", "data"), ("question-count", "data"), ("exam-start", "data")],
+        [("domain-select", "value", domain)],
+        state=[("session-id", "data", session_id)],
+        changed=[("domain-select", "value")],
+    )
+
+
+def show_results_request(session_id, n_clicks=1):
+    return callback_request(
+        [("results", "children")],
+        [("submit-btn", "n_clicks", n_clicks)],
+        state=[("session-id", "data", session_id)],
+        changed=[("submit-btn", "n_clicks")],
+    )
+
+
+def results_page_request(session_id, page):
+    return callback_request(
+        [("results-details", "children")],
+        [("results-page", "active_page", page)],
+        state=[("session-id", "data", session_id)],
+        changed=[("results-page", "active_page")],
+    )
@@ -0,0 +1,138 @@
+"""
+Concurrent-candidate load test for dash_app.py.
+
+Drives /_dash-update-component in-process through Flask's test client. Each simulated candidate
+starts a session, walks every question (render, select an answer, re-render the selection),
+submits and opens every results page. Navigation, timer and progress run in the browser,
+so they make no server calls. Reports p50/p95/p99 latency and throughput per callback
+and writes them to a JSON file so runs can be compared between versions.
+
+python benchmarks/load_test.py --candidates 50 --output load_test_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dash_app
+from dash_client import (display_question_request, post_callback, results_page_request, show_results_request,
+                         start_session_request, update_answers_request)
+from extraction_metrics import percentile
+
+
+def run_candidate(seed, domain, max_questions, timings, errors, lock, start_barrier):
+    rng = random.Random(seed)
+    client = dash_app.app.server.test_client()
+    local = defaultdict(list)
+    failed = defaultdict(int)
+
+    def call(name, payload):
+        status, elapsed, _, parsed = post_callback(client, payload)
+        local[name].append(elapsed)
+        if status not in (200, 204):
+            failed[name] += 1
+        return parsed
+
+    start_barrier.wait()
+    parsed = call("start_session", start_session_request(domain))
+    session_id = parsed["response"]["session-id"]["data"] if parsed else None
+
+    questions = dash_app.registry.get(domain)[:max_questions]
+    version = 0
+    for index, q in enumerate(questions):
+        call("display_question", display_question_request(session_id, index, version))
+        letters = "".join(sorted(rng.sample([o[0] for o in q['options']], k=1 + (len(q['answer']) > 1))))
+        parsed = call("update_answers", update_answers_request(session_id, index, len(q['options']), letters))
+        if parsed:
+            version = parsed["response"]["answers-version"]["data"]
+        call("display_question (patch)", display_question_request(session_id, index, version, changed="answers-version"))
+
+    call("show_results", show_results_request(session_id))
+    n_pages = max(-(-len(questions) // dash_app.RESULTS_PAGE_SIZE), 1)
+    for page in range(1, n_pages + 1):
+        call("render_results_page", results_page_request(session_id, page))
+
+    with lock:
+        for name, samples in local.items():
+            timings[name].extend(samples)
+        for name, count in failed.items():
+            errors[name] += count
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=50, help="simultaneous exam takers")
+    parser.add_argument("--domain", default=dash_app.DEFAULT_DOMAIN)
+    parser.add_argument("--questions", type=int, default=1000, help="max questions each candidate answers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_test_results.json")
+    args = parser.parse_args()
+
+    timings, errors = defaultdict(list), defaultdict(int)
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(args.candidates)
+    threads = [
+        threading.Thread(target=run_candidate,
+                         args=(args.seed + i, args.domain, args.questions, timings, errors, lock, start_barrier))
+        for i in range(args.candidates)
+    ]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+
+    callbacks = {}
+    for name, samples in sorted(timings.items()):
+        callbacks[name] = {
+            "requests": len(samples),
+            "errors": errors.get(name, 0),
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+            "throughput_rps": len(samples) / wall,
+        }
+    total_requests = sum(len(s) for s in timings.values())
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "candidates": args.candidates,
+        "domain": args.domain,
+        "wall_seconds": wall,
+        "total_requests": total_requests,
+        "throughput_rps": total_requests / wall,
+        "callbacks": callbacks,
+    }
+
+    print(f"{args.candidates} candidates, {total_requests} requests in {wall:.2f}s "
+          f"({results['throughput_rps']:.0f} req/s)")
+    print(f"{'callback':<26} {'reqs':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for name, row in callbacks.items():
+        print(f"{name:<26} {row['requests']:>6} {row['errors']:>4} {row['p50_ms']:>8.2f} "
+              f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['throughput_rps']:>8.1f}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Synthetic lecture recording for the capture benchmarks: a sequence of question slides, each shown
+for a few seconds, with a blinking cursor so frames within a slide are not byte-identical.
+"""
+import cv2
+import numpy as np
+
+SLIDE_SECONDS = (4, 9, 2, 15, 6, 3, 11, 7)
+
+
+def slide_image(slide, width, height):
+    image = np.full((height, width, 3), 250, np.uint8)
+    cv2.rectangle(image, (0, 0), (width, height // 8), (120, 60, 20), -1)
+    cv2.putText(image, f"Question {slide + 1}", (20, height // 12), cv2.FONT_HERSHEY_SIMPLEX, height / 500, (255, 255, 255), 2)
+    rng = np.random.RandomState(slide)
+    words = ["deploy", "pipeline", "stack", "bucket", "alarm", "role", "queue", "cluster", "backup", "metric"]
+    stem = [" ".join(rng.choice(words, rng.randint(4, 8))) for _ in range(rng.randint(1, 4))]
+    options = [f"{letter}. " + " ".join(rng.choice(words, rng.randint(2, 6))) for letter in "ABCD"]
+    lines = stem + options
+    for i, line in enumerate(lines):
+        y = height // 4 + i * height // 14
+        cv2.putText(image, line, (40, y), cv2.FONT_HERSHEY_SIMPLEX, height / 600, (30, 30, 30), 2)
+    return image
+
+
+def make_slide_video(path, seconds=240, fps=30, width=640, height=360):
+    """
+    Write the video and return the start time (seconds) of every slide.
+    Slide durations cycle through SLIDE_SECONDS.
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open a video writer for {path}")
+    starts = []
+    frame_index = 0
+    slide = 0
+    total = int(seconds * fps)
+    while frame_index < total:
+        starts.append(frame_index / fps)
+        base = slide_image(slide, width, height)
+        for _ in range(min(SLIDE_SECONDS[slide % len(SLIDE_SECONDS)] * fps, total - frame_index)):
+            frame = base.copy()
+            if (frame_index // (fps // 2)) % 2:
+                cv2.rectangle(frame, (width - 60, height - 40), (width - 50, height - 15), (0, 0, 0), -1)
+            writer.write(frame)
+            frame_index += 1
+        slide += 1
+    writer.release()
+    return starts
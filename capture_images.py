@@ -1,10 +1,172 @@
+import argparse
 import cv2
 import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-def capture_specific_times(video_path, output_folder, start_minute=1, start_second=15, interval_minutes=1):
+from frame_writer import FORMAT_EXTENSIONS, FrameWriter
+
+# Keyframe spacing assumed when the backend cannot report keyframes (x264's default keyint)
+DEFAULT_KEYFRAME_INTERVAL = 250
+# Fixed cost of one seek, in scanned frames: one seek cost as much as scanning ~28 frames on the
+# benchmarks/bench_capture_modes.py fixture (keyframe every 12), i.e. 22 + half a keyframe interval
+SEEK_OVERHEAD_FRAMES = 22
+# Frames are compared at this size (grayscale) when looking for slide changes
+THUMBNAIL_SIZE = (128, 72)
+# Thumbnail pixels must change by more than this many grey levels to count as changed
+PIXEL_DELTA = 24
+
+
+def get_capture_times(duration_seconds, start_minute=1, start_second=15, interval_minutes=1):
+    # Calculate capture times (in seconds)
+    capture_times = []
+    current_minute = start_minute
+    while True:
+        capture_time = (current_minute * 60) + start_second
+        if capture_time > duration_seconds:
+            break
+        capture_times.append(capture_time)
+        current_minute += interval_minutes
+    return capture_times
+
+
+def probe_keyframe_interval(video_path, max_frames=600):
+    """
+    Median distance between keyframes over the first max_frames frames, read with grab() only.
+    Returns None if the backend does not flag keyframes, and max_frames if no second keyframe
+    turned up (the spacing is at least that long).
+    """
+    video = cv2.VideoCapture(video_path)
+    keyframes = []
+    index = 0
+    while index < max_frames and len(keyframes) < 4 and video.grab():
+        if video.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME) > 0:
+            keyframes.append(index)
+        index += 1
+    video.release()
+    if not keyframes:
+        return None
+    if len(keyframes) == 1:
+        return max_frames
+    return int(statistics.median(b - a for a, b in zip(keyframes, keyframes[1:])))
+
+
+def choose_capture_mode(frame_numbers, keyframe_interval):
+    """
+    "scan" decodes every frame between targets; "seek" costs a fixed overhead plus decoding forward
+    from the previous keyframe, on average half a keyframe interval. Scan while the typical gap between
+    targets is no longer than that, since scanning also always lands on the exact frame.
+    """
+    if not frame_numbers:
+        return "seek"
+    gaps = [b - a for a, b in zip([0] + frame_numbers, frame_numbers)]
+    keyframe_interval = keyframe_interval or DEFAULT_KEYFRAME_INTERVAL
+    return "scan" if statistics.median(gaps) <= keyframe_interval / 2 + SEEK_OVERHEAD_FRAMES else "seek"
+
+
+def iter_frames(video, frame_numbers, mode="seek"):
+    """
+    Yield (frame_number, frame or None) for each of frame_numbers (ascending) from an open capture.
+    seek: set CAP_PROP_POS_FRAMES before each read.
+    scan: read forward from the current position, grab() to skip frames and retrieve() only the targets.
+    """
+    if mode == "seek":
+        for frame_number in frame_numbers:
+            video.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            ret, frame = video.read()
+            yield frame_number, frame if ret else None
+        return
+
+    position = int(video.get(cv2.CAP_PROP_POS_FRAMES))
+    exhausted = False
+    for frame_number in frame_numbers:
+        while not exhausted and position <= frame_number:
+            exhausted = not video.grab()
+            position += 1
+        if exhausted or position != frame_number + 1:
+            yield frame_number, None
+            continue
+        ret, frame = video.retrieve()
+        yield frame_number, frame if ret else None
+
+
+def timed(iterable, timings, key="decode_seconds"):
+    """
+    Yield from iterable, adding the time spent waiting on each item to timings[key].
+    """
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            timings[key] += time.perf_counter() - start
+            return
+        timings[key] += time.perf_counter() - start
+        yield item
+
+
+def print_timings(timings):
+    print(f"Decode {timings['decode_seconds']:.2f}s; encode {timings['encode_seconds']:.2f}s; write "
+          f"{timings['write_seconds']:.2f}s ({timings['bytes'] / 1e6:.1f} MB); "
+          f"decoding blocked {timings['blocked_seconds']:.2f}s on a full writer queue")
+
+
+def split_segments(targets, total_frames, workers):
+    """
+    Split (idx, capture_time, frame_number) targets into up to `workers` contiguous time ranges of
+    equal length. Returns (start_frame, targets) per non-empty range.
+    """
+    segments = []
+    for k in range(workers):
+        start, end = total_frames * k // workers, total_frames * (k + 1) // workers
+        in_range = [t for t in targets if start <= t[2] < end or (k == workers - 1 and t[2] >= end)]
+        if in_range:
+            segments.append((start, in_range))
+    return segments
+
+
+def capture_segment(video_path, output_folder, start_frame, targets, mode, writer_options=None):
+    """
+    Capture targets ((idx, capture_time, frame_number), ascending) with a capture handle of its own,
+    starting from start_frame. Runs in a worker process in parallel mode. Frames are saved by a
+    FrameWriter built from writer_options. Returns ((idx, path or None) pairs, timings).
+    """
+    video = cv2.VideoCapture(video_path)
+    if start_frame and mode == "scan":
+        # One seek to the start of the range, then scan forward from there
+        video.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    captured = []
+    timings = {"decode_seconds": 0.0}
+    frame_numbers = [frame_number for _, _, frame_number in targets]
+    with FrameWriter(**(writer_options or {})) as writer:
+        frames = timed(iter_frames(video, frame_numbers, mode), timings)
+        for (idx, capture_time, _), (_, frame) in zip(targets, frames):
+            if frame is not None:
+                output_path = writer.path(output_folder, f"frame_{idx+1:03d}")
+                writer.submit(frame, output_path)
+                captured.append((idx, output_path))
+                print(f"Captured {output_path} at {capture_time:.2f} seconds")
+            else:
+                captured.append((idx, None))
+                print(f"Failed to capture at {capture_time:.2f} seconds")
+
+    video.release()
+    timings.update(writer.stats())
+    return captured, timings
+
+
+def _capture_segment_args(args):
+    return capture_segment(*args)
+
+
+def capture_specific_times(video_path, output_folder, start_minute=1, start_second=15, interval_minutes=1,
+                           mode="auto", workers=1, writer_options=None):
     # Open the video file
     video = cv2.VideoCapture(video_path)
-    
+
     if not video.isOpened():
         print("Error: Could not open video.")
         return
@@ -13,6 +175,7 @@ def capture_specific_times(video_path, output_folder, start_minute=1, start_seco
     fps = video.get(cv2.CAP_PROP_FPS)
     total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
     duration_seconds = total_frames / fps
+    video.release()
 
     print(f"Video Duration: {duration_seconds:.2f} seconds")
 
@@ -20,35 +183,146 @@ def capture_specific_times(video_path, output_folder, start_minute=1, start_seco
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    # Calculate capture times (in seconds)
-    capture_times = []
-    current_minute = start_minute
-    while True:
-        capture_time = (current_minute * 60) + start_second
-        if capture_time > duration_seconds:
-            break
-        capture_times.append(capture_time)
-        current_minute += interval_minutes
+    capture_times = get_capture_times(duration_seconds, start_minute, start_second, interval_minutes)
 
     print(f"Capture Times (in seconds): {capture_times}")
 
+    targets = [(idx, capture_time, int(capture_time * fps)) for idx, capture_time in enumerate(capture_times)]
+    if mode == "auto":
+        keyframe_interval = probe_keyframe_interval(video_path)
+        mode = choose_capture_mode([frame_number for _, _, frame_number in targets], keyframe_interval)
+        print(f"Keyframe interval: {keyframe_interval or 'unknown'} frames, capture mode: {mode}")
+
     # Start capturing
-    for idx, capture_time in enumerate(capture_times):
-        frame_number = int(capture_time * fps)
-        video.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-        ret, frame = video.read()
-        
-        if ret:
-            output_path = os.path.join(output_folder, f"frame_{idx+1:03d}.jpg")
-            cv2.imwrite(output_path, frame)
-            print(f"Captured {output_path} at {capture_time:.2f} seconds")
-        else:
-            print(f"Failed to capture at {capture_time:.2f} seconds")
+    start = time.perf_counter()
+    if workers <= 1:
+        segment_results = [capture_segment(video_path, output_folder, 0, targets, mode, writer_options)]
+    else:
+        # Each time range gets its own process and capture handle; idx keeps the sequential file names
+        segments = split_segments(targets, total_frames, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [(video_path, output_folder, start_frame, segment, mode, writer_options)
+                    for start_frame, segment in segments]
+            segment_results = list(pool.map(_capture_segment_args, jobs))
+    elapsed = time.perf_counter() - start
+
+    results = [pair for pairs, _ in segment_results for pair in pairs]
+    timings = {key: sum(t[key] for _, t in segment_results) for key in segment_results[0][1]} if segment_results else {}
+    captured = [path for _, path in sorted(results) if path is not None]
+    print(f"Done capturing frames. {len(captured)} frames in {elapsed:.2f}s with {max(workers, 1)} worker(s)")
+    if timings:
+        print_timings(timings)
+    return captured
+
+
+def thumbnail(frame):
+    return cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def pixel_difference(a, b):
+    # Percentage of thumbnail pixels that changed; a blinking cursor or mouse pointer stays well under 1%
+    return 100 * float((cv2.absdiff(a, b) > PIXEL_DELTA).mean())
+
+
+def iter_slides(video, sample_fps=2.0, change_threshold=1.5, stable_threshold=0.5, stable_seconds=1.0,
+                timings=None):
+    """
+    Yield (seconds, frame) once per slide from an open capture, scanning it once.
+
+    Retrieves sample_fps frames per second and compares small grayscale thumbnails by the percentage
+    of pixels that changed. A sample counts as stable once less than stable_threshold percent has
+    changed for stable_seconds (so transitions and builds are skipped). The first stable frame
+    differing from the last yielded slide by more than change_threshold percent is yielded.
+    Slides shown for less than stable_seconds are skipped. Decode time is added to timings.
+    """
+    fps = video.get(cv2.CAP_PROP_FPS)
+    total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    step = max(int(round(fps / sample_fps)), 1)
+    timings = timings if timings is not None else {"decode_seconds": 0.0}
+    previous = None
+    last_saved = None
+    stable_since = 0.0
+    for frame_number, frame in timed(iter_frames(video, list(range(0, total_frames, step)), "scan"), timings):
+        if frame is None:
+            break
+        seconds = frame_number / fps
+        small = thumbnail(frame)
+        if previous is None or pixel_difference(small, previous) > stable_threshold:
+            stable_since = seconds
+        previous = small
+        if seconds - stable_since < stable_seconds:
+            continue
+        if last_saved is None or pixel_difference(small, last_saved) > change_threshold:
+            last_saved = small
+            yield seconds, frame
+
+
+def capture_slides(video_path, output_folder, sample_fps=2.0, change_threshold=1.5, stable_threshold=0.5,
+                   stable_seconds=1.0, writer_options=None):
+    """
+    Save one frame per slide instead of one per fixed interval (see iter_slides), as frame_NNN
+    images written by a FrameWriter built from writer_options.
+    Returns [(path, seconds)] for the saved slides.
+    """
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        print("Error: Could not open video.")
+        return []
+
+    fps = video.get(cv2.CAP_PROP_FPS)
+    total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    start = time.perf_counter()
+    saved = []
+    timings = {"decode_seconds": 0.0}
+    with FrameWriter(**(writer_options or {})) as writer:
+        for seconds, frame in iter_slides(video, sample_fps, change_threshold, stable_threshold, stable_seconds,
+                                          timings):
+            output_path = writer.path(output_folder, f"frame_{len(saved)+1:03d}")
+            writer.submit(frame, output_path)
+            saved.append((output_path, seconds))
+            print(f"Captured {output_path} at {seconds:.2f} seconds")
 
     video.release()
-    print("Done capturing frames.")
+    elapsed = time.perf_counter() - start
+    duration_seconds = total_frames / fps
+    timings.update(writer.stats())
+    print(f"Done capturing slides. {len(saved)} slides from {duration_seconds:.0f}s of video in {elapsed:.2f}s "
+          f"({duration_seconds / max(elapsed, 1e-9):.1f}x real time)")
+    print_timings(timings)
+    return saved
+
 
 if __name__ == "__main__":
-    video_file = "2.mp4"  
-    output_dir = "2"
-    capture_specific_times(video_file, output_dir)
+    parser = argparse.ArgumentParser(description="Capture frames from a lecture video at fixed times")
+    parser.add_argument("video", nargs="?", default="2.mp4", help="video file")
+    parser.add_argument("output", nargs="?", default="2", help="folder for the captured frames")
+    parser.add_argument("--start-minute", type=int, default=1)
+    parser.add_argument("--start-second", type=int, default=15)
+    parser.add_argument("--interval-minutes", type=int, default=1)
+    parser.add_argument("--mode", choices=["auto", "seek", "scan"], default="auto",
+                        help="seek to each capture time, scan forward through the video, or pick from keyframe spacing")
+    parser.add_argument("--workers", type=int, default=1, help="capture time ranges in this many processes")
+    parser.add_argument("--slides", action="store_true",
+                        help="ignore the fixed schedule and save one frame per detected slide change")
+    parser.add_argument("--change-threshold", type=float, default=1.5,
+                        help="percent of pixels that must differ from the last saved slide to count as a new slide")
+    parser.add_argument("--stable-seconds", type=float, default=1.0, help="how long a slide must stay still before it is saved")
+    parser.add_argument("--sample-fps", type=float, default=2.0, help="frames per second compared by --slides")
+    parser.add_argument("--image-format", choices=sorted(FORMAT_EXTENSIONS), default="jpeg")
+    parser.add_argument("--quality", type=int, default=95, help="JPEG/WebP quality (PNG: higher is faster, larger)")
+    parser.add_argument("--writer-threads", type=int, default=2, help="background encode/write threads; 0 writes inline")
+    parser.add_argument("--writer-queue", type=int, default=8, help="frames buffered for the writer before decoding waits")
+    args = parser.parse_args()
+
+    writer_options = {"image_format": args.image_format, "quality": args.quality,
+                      "threads": args.writer_threads, "max_queue": args.writer_queue}
+
+    if args.slides:
+        capture_slides(args.video, args.output, sample_fps=args.sample_fps, change_threshold=args.change_threshold,
+                       stable_seconds=args.stable_seconds, writer_options=writer_options)
+    else:
+        capture_specific_times(args.video, args.output, args.start_minute, args.start_second, args.interval_minutes,
+                               mode=args.mode, workers=args.workers, writer_options=writer_options)
@@ -1,51 +1,33 @@
-from dash import Dash, dcc, html, Input, Output, State, callback_context, ALL
+from dash import Dash, dcc, html, Input, Output, State, callback_context, ALL, ClientsideFunction, Patch, no_update
 import dash_bootstrap_components as dbc
 import pandas as pd
-import csv
-import re
+import numpy as np
 import os
+from question_bank import DEFAULT_BANKS_DIR, BankRegistry
+from answer_codec import decode_answers, letter_bit, letters_to_mask, mask_to_letters
+from session_store import DEFAULT_DB_PATH, SessionStore
+from scoring import decode_submission, grade_submission
 
-# python dash_app.py
-# Load questions
+# python dash_app.py            (development server)
+# python serve.py --workers 4   (production, see serve.py)
+# Question banks: every CSV under domainQuestions/ beside this file (or EXAM_BANKS_DIR), loaded per domain on first use
 base = os.getcwd()
 
-file = r"domainQuestions\domain_Domain 1_ SDLC Automation11.csv"
-file_path = os.path.join(base, file)
+questions_dir = os.environ.get("EXAM_BANKS_DIR", DEFAULT_BANKS_DIR)
 
-# Function to parse questions
-def parse_questions_from_csv(file_path):
-    questions = []
-    with open(file_path, mode='r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            question_text, options = extract_question_and_options(row["question"])
-            question_entry = {
-                "question": question_text.strip(),
-                "options": options,
-                "answer": row["answer"].strip(),  # e.g., "AB", "D", "BDF"
-            }
-            questions.append(question_entry)
-    return questions
+# Rows per page in the detailed results view
+RESULTS_PAGE_SIZE = 25
 
-# Helper to extract question and options
-def extract_question_and_options(text):
-    match = re.split(r'\n(?=[A-E]\.)', text, maxsplit=1)
-    if len(match) == 2:
-        question_part = match[0]
-        options_part = match[1]
-    else:
-        question_part = text
-        options_part = ""
-
-    options = re.findall(r'([A-E]\..*?)(?=\n[A-E]\.|$)', options_part, re.DOTALL)
-    return question_part, options
+# Exam state (answers, domain, start time) lives server-side; the browser only keeps the session id
+sessions = SessionStore(os.environ.get("EXAM_SESSION_DB", os.path.join(base, DEFAULT_DB_PATH)))
 
 # Initialize Dash app with a premium theme
-app = Dash(__name__, external_stylesheets=[
+app = Dash(__name__, suppress_callback_exceptions=True, external_stylesheets=[
     dbc.themes.LUX,  # Lux theme for a premium look
     "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css",  # Font Awesome icons
     "https://fonts.googleapis.com/css2?family=Montserrat:wght@400;500;600;700&display=swap"  # Google Font
 ])
+server = app.server  # WSGI application for production servers
 
 # Custom CSS
 CUSTOM_CSS = {
@@ -137,8 +119,33 @@ CUSTOM_CSS = {
     }
 }
 
+# Option styles are built once; every rendered option shares one of these dicts
+OPTION_STYLE = CUSTOM_CSS['option-item']
+OPTION_STYLE_SELECTED = {**CUSTOM_CSS['option-item'], **CUSTOM_CSS['option-item-selected']}
+OPTION_TEXT_STYLE = {'verticalAlign': 'middle'}
+OPTION_CHECKLIST_STYLE = {'display': 'inline-block'}
+
+def prebuild_question_fragments(questions):
+    """
+    Build the static parts of every question's view once, when its domain is loaded.
+    display_question only adds the selection state on top.
+    """
+    for index, q in enumerate(questions):
+        q['fragment'] = {
+            'text': f"Q{index + 1}: {q['question']}",
+            # (option bit, letter, checklist options, option text)
+            'options': [
+                (letter_bit(opt[0]), opt[0], [{'label': '', 'value': opt[0]}], html.Span(opt, style=OPTION_TEXT_STYLE))
+                for opt in q['options']
+            ],
+        }
 
-questions = parse_questions_from_csv(file_path)
+registry = BankRegistry(questions_dir, prepare=prebuild_question_fragments)
+DOMAINS = registry.domains()
+if not DOMAINS:
+    raise FileNotFoundError(f"No question bank CSVs found under {questions_dir}; "
+                            f"set EXAM_BANKS_DIR to the folder that holds them")
+DEFAULT_DOMAIN = DOMAINS[0]
 
 # App layout
 app.layout = dbc.Container([
@@ -152,6 +159,18 @@ app.layout = dbc.Container([
                         'textShadow': '1px 1px 3px rgba(0,0,0,0.2)'
                     }),
                     html.Div([
+                        html.Span([
+                            html.I(className="fas fa-layer-group me-2"),
+                            dcc.Dropdown(
+                                id="domain-select",
+                                options=[{'label': d, 'value': d} for d in DOMAINS],
+                                value=DEFAULT_DOMAIN,
+                                clearable=False,
+                                persistence=True,
+                                persistence_type='local',
+                                style={'width': '220px', 'display': 'inline-block', 'verticalAlign': 'middle', 'color': '#2c3e50'}
+                            )
+                        ], className="me-4"),
                         html.Span([
                             html.I(className="fas fa-clock me-2"),
                             html.Span(id="timer", style=CUSTOM_CSS['timer'])
@@ -217,8 +236,11 @@ app.layout = dbc.Container([
     
     # Hidden stores
     dcc.Interval(id='interval', interval=1000, n_intervals=0),
-    dcc.Store(id='current-index', data=0),
-    dcc.Store(id='answers', data={}),
+    dcc.Store(id='session-id', storage_type='local'),
+    dcc.Store(id='current-index', data=0, storage_type='local'),
+    dcc.Store(id='question-count', data=0),
+    dcc.Store(id='exam-start'),
+    dcc.Store(id='answers-version', data=0),  # bumped on every saved answer so the question re-renders
     
     # Custom CSS
     html.Div(
@@ -243,38 +265,60 @@ app.layout = dbc.Container([
     ))
 ], fluid=True, style={'minHeight': '100vh'})
 
-# Timer callback
-def format_time(n, total_time):
-    time_left = max(total_time - n, 0)
-    mins, secs = divmod(time_left, 60)
-    return f"{mins:02d}:{secs:02d}"
-
+# Resume the stored session if it is for the selected domain, otherwise start a new exam
 @app.callback(
+    Output("session-id", "data"),
+    Output("question-count", "data"),
+    Output("exam-start", "data"),
+    Input("domain-select", "value"),
+    State("session-id", "data")
+)
+def start_session(domain, session_id):
+    session = sessions.get(session_id)
+    if session is not None and session["domain"] == domain:
+        # Leave session-id untouched so navigation keeps the stored question index
+        new_session_id = no_update
+    else:
+        session = sessions.create(domain)
+        new_session_id = session["id"]
+    # Timer runs in the browser from the start timestamp (ms)
+    return new_session_id, len(registry.get(domain)), session["started_at"] * 1000
+
+# Timer, question counter, progress bar and navigation (assets/clientside.js)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="exam", function_name="updateTimer"),
     Output("timer", "children"),
-    Input("interval", "n_intervals")
+    Input("interval", "n_intervals"),
+    State("exam-start", "data"),
+    State("question-count", "data")
 )
-def update_timer(n):
-    total_time = 3 * len(questions) * 60  # 3 times the number of questions in minutes
-    return format_time(n, total_time)
 
-# Update question counter
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="exam", function_name="updateQuestionCounter"),
     Output("question-counter", "children"),
-    Input("current-index", "data")
+    Input("current-index", "data"),
+    Input("question-count", "data")
 )
-def update_question_counter(index):
-    return f"Question {index + 1} of {len(questions)}"
 
-# Update progress bar
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="exam", function_name="updateProgress"),
     Output("progress-fill", "style"),
-    Input("current-index", "data")
+    Input("current-index", "data"),
+    Input("question-count", "data"),
+    State("progress-fill", "style")
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="exam", function_name="navigate"),
+    Output('current-index', 'data'),
+    Input('prev-btn', 'n_clicks'),
+    Input('next-btn', 'n_clicks'),
+    Input('session-id', 'data'),
+    State('current-index', 'data'),
+    State('question-count', 'data'),
+    prevent_initial_call=True
 )
-def update_progress(index):
-    progress = (index + 1) / len(questions) * 100
-    style = CUSTOM_CSS['progress-fill'].copy()
-    style['width'] = f"{progress}%"
-    return style
 
 # Callback to load question
 @app.callback(
@@ -283,37 +327,49 @@ def update_progress(index):
     Output('prev-btn', 'disabled'),
     Output('next-btn', 'disabled'),
     Input('current-index', 'data'),
-    Input('answers', 'data')
+    Input('answers-version', 'data'),
+    Input('session-id', 'data')
 )
-def display_question(index, answers):
-    q = questions[index]
-    selected = answers.get(str(index), [])
+def display_question(index, answers_version, session_id):
+    session = sessions.get(session_id)
+    if session is None:
+        # Session is still being created (first visit) or has expired
+        return no_update, no_update, no_update, no_update
+
+    questions = registry.get(session["domain"])
+    index = max(0, min(index if isinstance(index, int) else 0, len(questions) - 1))
+    fragment = questions[index]['fragment']
+    selected = decode_answers(session["answers"], index + 1)[index]
+    
+    # Same question, only the selection changed: patch the option styles instead of resending the tree
+    triggered = [t['prop_id'] for t in callback_context.triggered]
+    if triggered == ['answers-version.data']:
+        patch = Patch()
+        for i, (bit, _, _, _) in enumerate(fragment['options']):
+            patch[i]['props']['style'] = OPTION_STYLE_SELECTED if selected & bit else OPTION_STYLE
+        return no_update, patch, no_update, no_update
     
-    # Create option items with custom styling
+    # Create option items from the prebuilt fragments
     options = []
-    for i, opt in enumerate(q['options']):
-        is_selected = opt[0] in selected
-        option_style = CUSTOM_CSS['option-item'].copy()
-        if is_selected:
-            option_style.update(CUSTOM_CSS['option-item-selected'])
-        
+    for i, (bit, letter, checklist_options, text) in enumerate(fragment['options']):
+        is_selected = bool(selected & bit)
         options.append(
             html.Label([
                 dcc.Checklist(
-                    options=[{'label': '', 'value': opt[0]}],
-                    value=[opt[0]] if is_selected else [],
+                    options=checklist_options,
+                    value=[letter] if is_selected else [],
                     id={'type': 'option', 'index': f'{index}-{i}'},
                     inputClassName="me-2",
-                    style={'display': 'inline-block'}
+                    style=OPTION_CHECKLIST_STYLE
                 ),
-                html.Span(opt, style={'verticalAlign': 'middle'})
+                text
             ], 
-            style=option_style,
+            style=OPTION_STYLE_SELECTED if is_selected else OPTION_STYLE,
             className="d-flex align-items-center"
         ))
     
     return (
-        f"Q{index + 1}: {q['question']}",
+        fragment['text'],
         options,
         index == 0,
         index == len(questions) - 1
@@ -321,17 +377,17 @@ def display_question(index, answers):
 
 # Callback to handle option selection
 @app.callback(
-    Output('answers', 'data'),
+    Output('answers-version', 'data'),
     Input({'type': 'option', 'index': ALL}, 'value'),
     State('current-index', 'data'),
-    State('answers', 'data'),
+    State('session-id', 'data'),
     prevent_initial_call=True
 )
-def update_answers(option_values, index, answers):
+def update_answers(option_values, index, session_id):
     # Get the context to see which input was triggered
     ctx = callback_context
     if not ctx.triggered:
-        return answers
+        return no_update
     
     # Get all selected options for current question
     selected = []
@@ -339,66 +395,44 @@ def update_answers(option_values, index, answers):
         if val:  # If option is selected
             selected.extend(val)
     
-    answers[str(index)] = selected
-    return answers
+    session = sessions.get(session_id)
+    if session is None:
+        return no_update
+    # The index and option values come from the browser: only accept a real question and its letters
+    n_questions = len(registry.get(session["domain"]))
+    if not isinstance(index, int) or not 0 <= index < n_questions:
+        return no_update
+    try:
+        mask = letters_to_mask(selected)
+    except (TypeError, ValueError):
+        return no_update
 
-# Callback to store answers and navigate
-@app.callback(
-    Output('current-index', 'data'),
-    Input('prev-btn', 'n_clicks'),
-    Input('next-btn', 'n_clicks'),
-    State('current-index', 'data'),
-    State('answers', 'data'),
-    prevent_initial_call=True
-)
-def navigate(prev_clicks, next_clicks, index, answers):
-    ctx = callback_context
-    if not ctx.triggered:
-        return index
-    
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    if button_id == 'next-btn' and index < len(questions) - 1:
-        index += 1
-    elif button_id == 'prev-btn' and index > 0:
-        index -= 1
-    return index
+    # Only the delta for this question is sent to the session store
+    session = sessions.set_answer(session_id, index, mask, n_questions)
+    if session is None:
+        return no_update
+    return session["version"]
 
 # Submit callback
 @app.callback(
     Output('results', 'children'),
     Input('submit-btn', 'n_clicks'),
-    State('answers', 'data'),
+    State('session-id', 'data'),
     prevent_initial_call=True
 )
-def show_results(n_clicks, answers):
+def show_results(n_clicks, session_id):
     if not n_clicks:
         return ''
     
-    score = 0
-    details = []
-    
-    for i, q in enumerate(questions):
-        ans = answers.get(str(i), [])
-        correct = q['answer']
-        correct_set = set(correct)
-        ans_set = set(ans)
-        is_correct = (ans_set == correct_set)
-        
-        if is_correct:
-            score += 1
-            
-        details.append(html.Div([
-            html.Div([
-                html.Span(f"Q{i+1}: ", style={'fontWeight': '600'}),
-                html.Span(f"Your answer: {''.join(sorted(ans)) if ans else 'No answer'}"),
-                html.Span(" • ", style={'color': '#999'}),
-                html.Span(f"Correct: {correct}", style={'color': '#4CAF50' if is_correct else '#F44336'}),
-                html.Span(" • ", style={'color': '#999'}),
-            ], style=CUSTOM_CSS['result-item'])
-        ]))
-    
-    percentage = (score / len(questions)) * 100
+    session = sessions.get(session_id)
+    if session is None:
+        return dbc.Alert("Your exam session has expired. Please start again.", color="warning")
+
+    # Whole submission graded in one batched step against the precomputed answer masks
+    report = grade_submission(registry.answer_key(session["domain"]), session["answers"])
+    percentage = report['percentage']
     result_color = '#4CAF50' if percentage >= 70 else '#F44336'
+    n_pages = max(-(-report['total'] // RESULTS_PAGE_SIZE), 1)
     
     return dbc.Card([
         dbc.CardBody([
@@ -411,7 +445,7 @@ def show_results(n_clicks, answers):
                             'fontWeight': '700',
                             'color': result_color
                         }),
-                        html.Div(f"{score} out of {len(questions)} correct", style={
+                        html.Div(f"{report['score']} out of {report['total']} correct", style={
                             'fontSize': '18px',
                             'color': '#666'
                         })
@@ -420,11 +454,46 @@ def show_results(n_clicks, answers):
                 
                 html.Div([
                     html.H5("Detailed Results", className="mb-3"),
-                    html.Div(details)
+                    # Only one page of rows is rendered at a time (render_results_page)
+                    html.Div(id='results-details'),
+                    dbc.Pagination(id='results-page', max_value=n_pages, active_page=1,
+                                   fully_expanded=False, className="mt-3")
                 ])
             ])
         ])
     ], style=CUSTOM_CSS['custom-card'])
 
+# Detailed results, one page at a time
+@app.callback(
+    Output('results-details', 'children'),
+    Input('results-page', 'active_page'),
+    State('session-id', 'data')
+)
+def render_results_page(page, session_id):
+    session = sessions.get(session_id)
+    if session is None:
+        return ''
+    
+    questions = registry.get(session["domain"])
+    answer_masks = registry.answer_key(session["domain"])
+    start = ((page or 1) - 1) * RESULTS_PAGE_SIZE
+    stop = min(start + RESULTS_PAGE_SIZE, len(questions))
+    # Grade just the rows on this page
+    submitted = decode_submission(session["answers"], len(questions))[start:stop]
+    correct = submitted == np.frombuffer(answer_masks, dtype=np.uint8)[start:stop]
+    
+    details = []
+    for i, ans_mask, is_correct in zip(range(start, stop), submitted.tolist(), correct.tolist()):
+        ans = mask_to_letters(ans_mask)
+        details.append(html.Div([
+            html.Span(f"Q{i+1}: ", style={'fontWeight': '600'}),
+            html.Span(f"Your answer: {ans if ans else 'No answer'}"),
+            html.Span(" • ", style={'color': '#999'}),
+            html.Span(f"Correct: {questions[i]['answer']}", style={'color': '#4CAF50' if is_correct else '#F44336'}),
+        ], style=CUSTOM_CSS['result-item']))
+    return details
+
 if __name__ == '__main__':
+    # Parse any new or changed banks in parallel before serving
+    registry.compile_all()
     app.run(debug=True)
\ No newline at end of file
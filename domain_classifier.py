@@ -0,0 +1,275 @@
+import argparse
+import csv
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from question_bank import discover_banks, domain_from_path
+from question_tokenizer import normalize_answer, tokenize_question
+
+# The six exam domains, as originally sent to the model in every extraction prompt
+DOMAINS = """
+            Domain 1: SDLC Automation
+        CI/CD Pipelines: Set up build, test, and deployment automation (CodeBuild, CodeDeploy, Secrets Manager).
+
+        Automated Testing: Integrate unit, integration, and security tests in pipelines.
+
+        Artifact Management: Securely store and manage build artifacts (S3, ECR, CodeArtifact).
+
+        Deployment Strategies: Implement blue/green, canary, and immutable deployments for EC2, containers, and serverless.
+
+        Domain 2: Configuration Management & IaC
+        IaC: Use CloudFormation, CDK, or SAM to automate infrastructure.
+
+        Multi-Account Automation: Manage accounts with AWS Organizations, Control Tower, and IAM policies.
+
+        Large-Scale Automation: Automate patching, compliance, and workflows using Systems Manager & Lambda.
+
+        Domain 3: Resilient Cloud Solutions
+        High Availability: Multi-AZ/multi-Region setups, failover, and load balancing.
+
+        Scalability: Auto Scaling, serverless, and containerized workloads (ECS, EKS).
+
+        Disaster Recovery: Backup strategies, RTO/RPO compliance, and automated recovery.
+
+        Domain 4: Monitoring & Logging
+        Log & Metric Collection: Use CloudWatch, Kinesis, and X-Ray for monitoring.
+
+        Analysis & Alerts: Create dashboards, detect anomalies, and set up alarms.
+
+        Automation: Trigger actions via EventBridge, SNS, and Lambda for event-driven responses.
+
+        Domain 5: Incident & Event Response
+        Event Processing: Use EventBridge, SQS, and Step Functions for workflows.
+
+        Automated Remediation: Fix issues with Systems Manager and AWS Config.
+
+        Troubleshooting: Analyze failures using CloudWatch, X-Ray, and deployment logs.
+
+        Domain 6: Security & Compliance
+        IAM at Scale: Least privilege, role-based access, and automated credential rotation.
+
+        Security Automation: Enforce controls via Security Hub, WAF, KMS, and Macie.
+
+        Auditing & Monitoring: Track threats with GuardDuty, Inspector, and CloudTrail.
+    """
+
+# Services and topics that the short descriptions above leave out, so more questions land on a term
+DOMAIN_KEYWORDS = {
+    "Domain 1": "CodePipeline CodeCommit CodeBuild CodeDeploy CodeArtifact ECR buildspec appspec "
+                "deployment group lifecycle hook pipeline stage approval artifact repository branch commit "
+                "unit test integration test blue/green canary linear all-at-once rolling immutable traffic shifting "
+                "Elastic Beanstalk Lambda alias version",
+    "Domain 2": "CloudFormation stack StackSets change set drift template nested stack custom resource "
+                "CDK SAM Organizations SCP service control policy Control Tower landing zone account "
+                "Systems Manager Parameter Store State Manager Patch Manager maintenance window Run Command "
+                "Automation runbook OpsWorks Service Catalog AMI Image Builder tag policy",
+    "Domain 3": "Multi-AZ multi-Region failover Route 53 health check latency routing Auto Scaling group "
+                "launch template Elastic Load Balancing ALB NLB target group Aurora global database DynamoDB "
+                "global tables read replica backup restore snapshot AWS Backup RTO RPO pilot light warm standby "
+                "ECS EKS Fargate cluster capacity scalability",
+    "Domain 4": "CloudWatch Logs metric filter alarm dashboard Logs Insights subscription filter agent "
+                "Kinesis Data Streams Firehose OpenSearch X-Ray tracing anomaly detection composite alarm "
+                "custom metric embedded metric format log group retention Athena QuickSight",
+    "Domain 5": "EventBridge rule event bus SNS topic SQS queue dead-letter Step Functions state machine "
+                "incident response remediation Config rule conformance pack Systems Manager OpsCenter Incident Manager "
+                "Health Dashboard troubleshoot failed deployment rollback root cause",
+    "Domain 6": "IAM role policy permission boundary least privilege assume role STS federation SSO Identity Center "
+                "Secrets Manager rotation KMS key encryption Security Hub GuardDuty Inspector Macie WAF Shield "
+                "CloudTrail audit compliance Firewall Manager Access Analyzer vulnerability finding",
+}
+
+# Common English words that say nothing about the domain
+STOPWORDS = frozenset("""
+a an and are as at be by can company do does for from has have how in is it its need needs of on or should so
+that the their them then this to use used uses using want wants what when which will with within without
+""".split())
+
+UNCLASSIFIED = ""
+# Weight of a distractor option's terms relative to the stem and the correct option(s). Distractors are
+# usually services from other domains, so at full weight they can outvote the stem.
+DISTRACTOR_WEIGHT = 0.3
+
+
+def parse_domains(text: str = DOMAINS) -> Dict[str, str]:
+    """
+    Split the domain block into {"Domain N: Title": description}.
+    """
+    domains: Dict[str, str] = {}
+    label = None
+    for line in text.splitlines():
+        line = line.strip()
+        match = re.match(r'Domain\s*(\d+)\s*:\s*(.+)', line)
+        if match:
+            label = f"Domain {match.group(1)}: {match.group(2)}"
+            domains[label] = match.group(2)
+        elif label and line:
+            domains[label] += "\n" + line
+    return domains
+
+
+def normalize_domain(label) -> str:
+    """
+    "Domain 3: Resilient Cloud Solutions", "domain 3" or 3 -> "Domain 3"; anything else -> "".
+    """
+    match = re.search(r'Domain\s*(\d+)', str(label or ""), re.IGNORECASE)
+    if match:
+        return f"Domain {int(match.group(1))}"
+    return UNCLASSIFIED
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase words plus adjacent-word bigrams, so "Step Functions" and "Parameter Store" count as terms.
+    """
+    words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS and len(w) > 1]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class DomainClassifier:
+    """
+    TF-IDF nearest-centroid classifier over the domain descriptions (plus DOMAIN_KEYWORDS).
+    Each domain is one document; a question is assigned the domain whose vector has the highest
+    cosine similarity with its own. Questions sharing no term with any domain stay unclassified.
+    Given the answer, a question is scored on its stem and correct option(s), with the distractor
+    options down-weighted to DISTRACTOR_WEIGHT.
+    """
+
+    def __init__(self, domains: Optional[Dict[str, str]] = None,
+                 keywords: Optional[Dict[str, str]] = DOMAIN_KEYWORDS):
+        domains = domains if domains is not None else parse_domains()
+        documents = {}
+        for label, description in domains.items():
+            extra = (keywords or {}).get(normalize_domain(label), "")
+            documents[label] = Counter(tokenize(label + "\n" + description + "\n" + extra))
+
+        df = Counter(term for counts in documents.values() for term in counts)
+        n = len(documents)
+        # Smoothed IDF: terms shared by every domain still count a little
+        self.idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        self.labels = list(documents)
+        self.vectors = [self._vector(counts) for counts in documents.values()]
+
+    def _vector(self, counts: Counter) -> Dict[str, float]:
+        # Sublinear tf; weighted counts below 1 (distractor terms) are used as they are
+        vector = {term: (1 + math.log(tf) if tf >= 1 else tf) * self.idf[term]
+                  for term, tf in counts.items() if term in self.idf}
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        return {term: v / norm for term, v in vector.items()} if norm else {}
+
+    def _counts(self, text: str, answer: Optional[str]) -> Counter:
+        stem, options = tokenize_question(text)
+        letters = normalize_answer(answer or "", options)
+        if not letters:
+            return Counter(tokenize(text))
+        counts = Counter(tokenize(stem))
+        for option in options:
+            option_counts = Counter(tokenize(option[2:]))
+            if option[0] not in letters:
+                option_counts = Counter({term: tf * DISTRACTOR_WEIGHT for term, tf in option_counts.items()})
+            counts.update(option_counts)
+        return counts
+
+    def scores(self, text: str, answer: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        (label, cosine similarity) for every domain, best first. Without a usable answer the whole
+        text counts equally.
+        """
+        query = self._vector(self._counts(text, answer))
+        scored = [(label, sum(weight * vector.get(term, 0.0) for term, weight in query.items()))
+                  for label, vector in zip(self.labels, self.vectors)]
+        return sorted(scored, key=lambda item: item[1], reverse=True)
+
+    def classify(self, text: str, answer: Optional[str] = None) -> str:
+        label, score = self.scores(text, answer)[0]
+        return label if score > 0 else UNCLASSIFIED
+
+
+def load_labelled(path: str) -> List[Tuple[str, str, str, str]]:
+    """
+    (source, question text, answer, model-assigned domain) rows from existing data:
+    a folder of domain bank CSVs (domain from the file name), an extraction CSV with a domain_class
+    column, or an extraction .jsonl (model_domain_class if present, else domain_class).
+    """
+    rows = []
+    if os.path.isdir(path):
+        for domain, files in discover_banks(path).items():
+            for file_path in files:
+                with open(file_path, encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        rows.append((os.path.basename(file_path), row.get("question", ""),
+                                     row.get("answer", ""), domain))
+    elif path.endswith(".jsonl"):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                label = record.get("model_domain_class") or record.get("domain_class")
+                rows.append((record.get("image", path), record.get("question_and_options", ""),
+                             record.get("answer", ""), label))
+    else:
+        with open(path, encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                text = row.get("question_and_options") or row.get("question", "")
+                rows.append((path, text, row.get("answer", ""), row.get("domain_class") or domain_from_path(path)))
+    return [row for row in rows if row[1] and normalize_domain(row[3])]
+
+
+def agreement_report(rows: Iterable[Tuple[str, str, str, str]], classifier: Optional[DomainClassifier] = None) -> Dict:
+    """
+    Compare the classifier with model-assigned domains: overall agreement, per-domain agreement,
+    a confusion table {model domain: {classifier domain: count}} and the disagreeing rows.
+    full_text_agreement is the share that would agree if every option counted equally.
+    """
+    classifier = classifier or DomainClassifier()
+    confusion: Dict[str, Counter] = {}
+    disagreements = []
+    total = agreed = full_text_agreed = 0
+    for source, text, answer, label in rows:
+        expected = normalize_domain(label)
+        predicted = normalize_domain(classifier.classify(text, answer))
+        full_text_agreed += normalize_domain(classifier.classify(text)) == expected
+        confusion.setdefault(expected, Counter())[predicted or "unclassified"] += 1
+        total += 1
+        if predicted == expected:
+            agreed += 1
+        else:
+            disagreements.append({"source": source, "model": expected, "classifier": predicted or "unclassified",
+                                  "question": text[:120]})
+    return {
+        "total": total,
+        "agreed": agreed,
+        "agreement": agreed / total if total else 0.0,
+        "full_text_agreement": full_text_agreed / total if total else 0.0,
+        "by_domain": {domain: {"total": sum(counts.values()), "agreed": counts[domain]}
+                      for domain, counts in sorted(confusion.items())},
+        "confusion": {domain: dict(counts) for domain, counts in sorted(confusion.items())},
+        "disagreements": disagreements,
+    }
+
+
+def print_report(report: Dict) -> None:
+    print(f"Agreement: {report['agreed']}/{report['total']} ({report['agreement']:.1%}); "
+          f"{report['full_text_agreement']:.1%} scoring distractor options at full weight")
+    for domain, row in report["by_domain"].items():
+        print(f"  {domain}: {row['agreed']}/{row['total']}  classifier said {report['confusion'][domain]}")
+    for row in report["disagreements"]:
+        print(f"  [{row['source']}] model {row['model']}, classifier {row['classifier']}: {row['question']!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the local domain classifier with model-assigned domains")
+    parser.add_argument("paths", nargs="+", help="bank folders, extraction CSVs or .jsonl files")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    rows = [row for path in args.paths for row in load_labelled(path)]
+    report = agreement_report(rows)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,171 @@
+import json
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+STAGES = ("encode", "wait", "request", "parse", "total")
+QUANTILES = (50, 95, 99)
+
+
+def percentile(samples, pct):
+    # Nearest-rank percentile over a sorted copy
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class ExtractionMetrics:
+    """
+    Per-image instrumentation for an extraction run. start() hands out a record that the pipeline
+    fills in as the image moves through it:
+
+        encode_seconds    reading, preprocessing and base64-encoding the image
+        wait_seconds      waiting on the rate limiter
+        request_seconds   model calls, including retried attempts
+        parse_seconds     parsing and validating the response
+        payload_bytes     request body bytes sent (batched requests are split evenly between images)
+        response_bytes    response body bytes received (split the same way)
+        retries, cached, batch_size, status ("success"/"failure") and reason for failures
+        fallback          sent again on its own after its batch failed or returned a malformed entry
+
+    finish() stores the record. summary() reports throughput and p50/p95/p99 per stage, which
+    write() emits as JSON and in the Prometheus text exposition format. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self.records: List[Dict] = []
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._last_finished = self._started
+
+    def start(self, image: str) -> Dict:
+        return {
+            "image": image,
+            "encode_seconds": 0.0,
+            "wait_seconds": 0.0,
+            "request_seconds": 0.0,
+            "parse_seconds": 0.0,
+            "total_seconds": 0.0,
+            "payload_bytes": 0,
+            "response_bytes": 0,
+            "retries": 0,
+            "cached": False,
+            "batch_size": 1,
+            "fallback": False,
+            "status": None,
+            "reason": None,
+            "_started": time.perf_counter(),
+        }
+
+    def finish(self, record: Dict, result: Dict) -> None:
+        now = time.perf_counter()
+        record["total_seconds"] = now - record.pop("_started")
+        if "error" in result:
+            record["status"] = "failure"
+            record["reason"] = record["reason"] or str(result["error"])
+        else:
+            record["status"] = "success"
+            record["reason"] = None
+        with self._lock:
+            self.records.append(record)
+            self._last_finished = max(self._last_finished, now)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            records = list(self.records)
+            elapsed = self._last_finished - self._started
+
+        failures: Dict[str, int] = {}
+        for r in records:
+            if r["status"] == "failure":
+                failures[r["reason"]] = failures.get(r["reason"], 0) + 1
+        stages = {}
+        for stage in STAGES:
+            samples = [r[f"{stage}_seconds"] for r in records]
+            stages[stage] = {f"p{q}": percentile(samples, q) for q in QUANTILES}
+            stages[stage]["sum"] = sum(samples)
+        return {
+            "images": len(records),
+            "succeeded": sum(r["status"] == "success" for r in records),
+            "failed": sum(r["status"] == "failure" for r in records),
+            "cached": sum(r["cached"] for r in records),
+            "retries": sum(r["retries"] for r in records),
+            "fallbacks": sum(r["fallback"] for r in records),
+            "payload_bytes": sum(r["payload_bytes"] for r in records),
+            "response_bytes": sum(r["response_bytes"] for r in records),
+            "elapsed_seconds": elapsed,
+            "images_per_minute": len(records) / elapsed * 60 if elapsed > 0 else 0.0,
+            "seconds": stages,
+            "failure_reasons": failures,
+        }
+
+    def to_json(self) -> Dict:
+        with self._lock:
+            records = list(self.records)
+        return {"summary": self.summary(), "images": records}
+
+    def to_prometheus(self) -> str:
+        summary = self.summary()
+        lines = [
+            "# HELP extraction_images_total Images processed, by outcome.",
+            "# TYPE extraction_images_total counter",
+            f'extraction_images_total{{status="success"}} {summary["succeeded"]}',
+            f'extraction_images_total{{status="failure"}} {summary["failed"]}',
+            "# HELP extraction_failures_total Failed images, by reason.",
+            "# TYPE extraction_failures_total counter",
+        ]
+        lines += [f'extraction_failures_total{{reason="{_escape(reason)}"}} {count}'
+                  for reason, count in sorted(summary["failure_reasons"].items())]
+        lines += [
+            "# HELP extraction_cached_images_total Images answered from the response cache.",
+            "# TYPE extraction_cached_images_total counter",
+            f"extraction_cached_images_total {summary['cached']}",
+            "# HELP extraction_retries_total Throttled requests retried.",
+            "# TYPE extraction_retries_total counter",
+            f"extraction_retries_total {summary['retries']}",
+            "# HELP extraction_batch_fallbacks_total Batched images sent again as a single-image request.",
+            "# TYPE extraction_batch_fallbacks_total counter",
+            f"extraction_batch_fallbacks_total {summary['fallbacks']}",
+            "# HELP extraction_payload_bytes_total Request body bytes sent to the model.",
+            "# TYPE extraction_payload_bytes_total counter",
+            f"extraction_payload_bytes_total {summary['payload_bytes']}",
+            "# HELP extraction_response_bytes_total Response body bytes received from the model.",
+            "# TYPE extraction_response_bytes_total counter",
+            f"extraction_response_bytes_total {summary['response_bytes']}",
+            "# HELP extraction_images_per_minute Throughput over the run.",
+            "# TYPE extraction_images_per_minute gauge",
+            f"extraction_images_per_minute {summary['images_per_minute']:.3f}",
+            "# HELP extraction_image_seconds Per-image time spent in each stage.",
+            "# TYPE extraction_image_seconds summary",
+        ]
+        for stage, row in summary["seconds"].items():
+            for q in QUANTILES:
+                lines.append(f'extraction_image_seconds{{stage="{stage}",quantile="{q / 100}"}} {row[f"p{q}"]:.6f}')
+            lines.append(f'extraction_image_seconds_sum{{stage="{stage}"}} {row["sum"]:.6f}')
+            lines.append(f'extraction_image_seconds_count{{stage="{stage}"}} {summary["images"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path: Optional[str] = None, prometheus_path: Optional[str] = None) -> None:
+        if json_path:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_json(), f, indent=2)
+        if prometheus_path:
+            with open(prometheus_path, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+
+    def print_summary(self) -> None:
+        summary = self.summary()
+        print(f"Metrics: {summary['images']} images ({summary['failed']} failed, {summary['cached']} cached, "
+              f"{summary['retries']} retries, {summary['fallbacks']} batch fallbacks) in {summary['elapsed_seconds']:.1f}s, "
+              f"{summary['images_per_minute']:.1f} images/min")
+        for stage, row in summary["seconds"].items():
+            print(f"  {stage:<8} p50 {row['p50']:.3f}s  p95 {row['p95']:.3f}s  p99 {row['p99']:.3f}s")
+        for reason, count in sorted(summary["failure_reasons"].items()):
+            print(f"  failed: {count} x {reason}")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
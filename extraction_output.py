@@ -0,0 +1,109 @@
+import csv
+import json
+import os
+from typing import Dict, List, Set
+
+CSV_FIELDS = ['question_and_options', 'answer', 'domain_class']
+
+
+class StreamingResultWriter:
+    """
+    Writes extraction results to disk as each image finishes, so a crash loses at most the image
+    in flight. Given results.csv it maintains:
+
+        results.csv           successful rows (appended, header written once)
+        results.jsonl         the same rows as JSON lines, with the source image name
+        results.done          checkpoint manifest: one completed image filename per line
+        results.errors.jsonl  failed images with their error, retried by --retry-errors
+
+    Every write is flushed before the image is recorded in the manifest. With restart, existing
+    files from an earlier run are moved aside to <name>.prev and the run starts from empty files.
+    """
+
+    def __init__(self, csv_path: str, restart: bool = False):
+        stem = os.path.splitext(csv_path)[0]
+        self.csv_path = csv_path
+        self.jsonl_path = stem + ".jsonl"
+        self.manifest_path = stem + ".done"
+        self.errors_path = stem + ".errors.jsonl"
+        self.written = 0
+        self.failed = 0
+        self._files = []
+
+        directory = os.path.dirname(os.path.abspath(csv_path))
+        os.makedirs(directory, exist_ok=True)
+        if restart:
+            for path in (csv_path, self.jsonl_path, self.manifest_path, self.errors_path):
+                if os.path.exists(path):
+                    os.replace(path, path + ".prev")
+        needs_header = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+        self._csv_file = self._open(csv_path)
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        if needs_header:
+            self._csv.writeheader()
+            self._csv_file.flush()
+        self._jsonl = self._open(self.jsonl_path)
+        self._manifest = self._open(self.manifest_path)
+        self._errors = self._open(self.errors_path)
+
+    def _open(self, path):
+        f = open(path, mode='a', newline='', encoding='utf-8')
+        self._files.append(f)
+        return f
+
+    def completed(self) -> Set[str]:
+        """
+        Filenames already recorded in the manifest by this or a previous run.
+        """
+        return set(_read_lines(self.manifest_path))
+
+    def write(self, filename: str, result: Dict) -> None:
+        if 'error' in result:
+            self._errors.write(json.dumps({'image': filename, **result}) + "\n")
+            self._errors.flush()
+            self.failed += 1
+            return
+
+        self._csv.writerow(result)
+        self._csv_file.flush()
+        self._jsonl.write(json.dumps({'image': filename, **result}) + "\n")
+        self._jsonl.flush()
+        # Manifest last: an image only counts as done once its row is on disk
+        self._manifest.write(filename + "\n")
+        self._manifest.flush()
+        self.written += 1
+
+    def close(self) -> None:
+        for f in self._files:
+            f.close()
+        self._files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_lines(path: str) -> List[str]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def take_failed_images(csv_path: str) -> Set[str]:
+    """
+    Filenames from the error log next to csv_path, for a retry run. The log is moved aside to
+    <name>.errors.jsonl.prev so the retry starts a fresh one with only the images that fail again.
+    """
+    errors_path = os.path.splitext(csv_path)[0] + ".errors.jsonl"
+    failed = set()
+    for line in _read_lines(errors_path):
+        try:
+            failed.add(json.loads(line)['image'])
+        except (json.JSONDecodeError, KeyError, TypeError):
+            continue
+    if os.path.exists(errors_path):
+        os.replace(errors_path, errors_path + ".prev")
+    return failed
@@ -0,0 +1,120 @@
+import io
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Rough token cost of one screenshot-sized image, for the usage block of fake responses
+IMAGE_INPUT_TOKENS = 1500
+
+DEFAULT_RESPONSES = [
+    {"question_and_options": "A team wants every commit built and tested automatically. Which service should run the tests?\n"
+                             "A. AWS CodeBuild\nB. Amazon Macie\nC. AWS Backup\nD. Amazon Route 53",
+     "answer": "A"},
+    {"question_and_options": "Which TWO services collect and search application logs?\n"
+                             "A. Amazon CloudWatch Logs\nB. AWS KMS\nC. Amazon OpenSearch Service\nD. AWS Organizations",
+     "answer": "AC"},
+    {"question_and_options": "How should database credentials be rotated with the least operational overhead?\n"
+                             "A. A cron job on EC2\nB. AWS Secrets Manager rotation\nC. Parameter Store plain strings\n"
+                             "D. Hardcode them in the AMI",
+     "answer": "B"},
+]
+
+
+class FakeClientError(Exception):
+    """
+    Shaped like botocore's ClientError, so throttling.error_code() and the retry logic treat it the same way.
+    """
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"An error occurred ({code}) when calling the InvokeModel operation: {message}")
+        self.response = {"Error": {"Code": code, "Message": message}}
+
+
+class FakeBedrock:
+    """
+    Local stand-in for the bedrock-runtime client, for running and benchmarking extraction offline.
+
+    Every call sleeps latency + per_image_latency * images (+ up to jitter seconds). With capacity,
+    a call arriving while that many are already in flight is rejected with ThrottlingException, the way
+    a saturated account quota behaves; throttle_rate rejects a random share of calls on top of that.
+    malformed_rate returns a random share of answers as prose with no JSON. Answers cycle through
+    `responses` (one object per image; a JSON array for multi-image requests), with usage token counts.
+    """
+
+    def __init__(self, latency: float = 0.5, per_image_latency: float = 0.0, jitter: float = 0.0,
+                 capacity: Optional[int] = None, throttle_rate: float = 0.0, malformed_rate: float = 0.0,
+                 responses: Optional[List[Dict]] = None, seed: Optional[int] = None):
+        self.latency = latency
+        self.per_image_latency = per_image_latency
+        self.jitter = jitter
+        self.capacity = capacity
+        self.throttle_rate = throttle_rate
+        self.malformed_rate = malformed_rate
+        self._responses = itertools.cycle(responses or DEFAULT_RESPONSES)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.calls = 0
+        self.throttled = 0
+        self.malformed = 0
+        self.max_in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeBedrock":
+        """
+        Configured from EXAM_FAKE_LATENCY, EXAM_FAKE_CAPACITY, EXAM_FAKE_THROTTLE_RATE and EXAM_FAKE_MALFORMED_RATE.
+        """
+        capacity = os.getenv("EXAM_FAKE_CAPACITY")
+        return cls(latency=float(os.getenv("EXAM_FAKE_LATENCY", "0.5")),
+                   capacity=int(capacity) if capacity else None,
+                   throttle_rate=float(os.getenv("EXAM_FAKE_THROTTLE_RATE", "0")),
+                   malformed_rate=float(os.getenv("EXAM_FAKE_MALFORMED_RATE", "0")))
+
+    def invoke_model(self, body, modelId=None, accept=None, contentType=None):
+        request = json.loads(body)
+        content = request["messages"][0]["content"]
+        images = sum(1 for block in content if block.get("type") == "image")
+        prompt_chars = sum(len(block.get("text", "")) for block in content if block.get("type") == "text")
+
+        with self._lock:
+            self.calls += 1
+            if (self.capacity is not None and self._in_flight >= self.capacity) or \
+                    self._random.random() < self.throttle_rate:
+                self.throttled += 1
+                raise FakeClientError("ThrottlingException", "Too many requests, please wait before trying again.")
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            malformed = self._random.random() < self.malformed_rate
+            delay = self.latency + self.per_image_latency * images + self._random.uniform(0, self.jitter)
+            answers = [next(self._responses) for _ in range(images)]
+            if malformed:
+                self.malformed += 1
+
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        if malformed:
+            text = "I'm sorry, the text in this image is too blurry to read reliably."
+        elif images == 1:
+            text = json.dumps(answers[0])
+        else:
+            text = json.dumps(answers)
+        response = {
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": images * IMAGE_INPUT_TOKENS + prompt_chars // 4,
+                      "output_tokens": len(text) // 4},
+        }
+        return {"body": io.BytesIO(json.dumps(response).encode("utf-8"))}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "throttled": self.throttled, "malformed": self.malformed,
+                    "max_in_flight": self.max_in_flight}
@@ -0,0 +1,69 @@
+import os
+from typing import Dict, List, Sequence, Tuple
+
+from PIL import Image
+
+# 16 x 16 = 256 bits. At 8 x 8 (64 bits), slides built from one template with different text were only
+# 1-4 bits apart, closer than two frames of the same slide (benchmarks/bench_frame_dedup.py).
+HASH_SIZE = 16
+# Largest distance (of 256 bits) between consecutive frames of one slide that still counts as a repeat
+DEFAULT_THRESHOLD = 10
+
+
+def dhash(image_path: str, hash_size: int = HASH_SIZE) -> int:
+    """
+    Difference hash: shrink to (hash_size + 1) x hash_size grayscale and set one bit per pixel that is
+    brighter than its right-hand neighbour. Frames of the same slide (re-encoded, slightly shifted,
+    a cursor moved) land within a few bits of each other; different slides differ in many.
+    """
+    with Image.open(image_path) as img:
+        small = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+        pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def group_near_duplicates(hashes: Sequence[Tuple[str, int]], threshold: int) -> List[List[str]]:
+    """
+    Group runs of consecutive names whose hashes are within `threshold` bits of the previous one.
+    Frames must be in capture order: a repeated slide is always adjacent, and comparing with every
+    earlier frame would only add false merges between similar-looking slides. Each group's
+    representative (first member) is the earliest frame of the run.
+    """
+    groups: List[List[str]] = []
+    previous = None
+    for name, value in hashes:
+        if previous is not None and hamming(value, previous) <= threshold:
+            groups[-1].append(name)
+        else:
+            groups.append([name])
+        previous = value
+    return groups
+
+
+def deduplicate_images(folder_path: str, filenames: Sequence[str], threshold: int) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Return (representative filenames in input order, {representative: [its duplicates]}).
+    Images that cannot be hashed are kept as their own representative.
+    """
+    hashes = []
+    unhashable = []
+    for filename in filenames:
+        try:
+            hashes.append((filename, dhash(os.path.join(folder_path, filename))))
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Could not hash {filename} for dedup: {e}")
+            unhashable.append(filename)
+
+    duplicates = {group[0]: group[1:] for group in group_near_duplicates(hashes, threshold)}
+    duplicates.update({filename: [] for filename in unhashable})
+    representatives = [filename for filename in filenames if filename in duplicates]
+    return representatives, duplicates
@@ -0,0 +1,112 @@
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import cv2
+
+FORMAT_EXTENSIONS = {
+    "jpeg": ".jpg",
+    "png": ".png",
+    "webp": ".webp",
+}
+
+
+def encode_params(image_format: str, quality: int) -> List[int]:
+    if image_format == "jpeg":
+        return [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if image_format == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, quality]
+    # PNG is lossless; map quality 0-100 to compression effort 9-0 so higher quality still means faster/larger
+    return [cv2.IMWRITE_PNG_COMPRESSION, max(0, min(9, round((100 - quality) / 11)))]
+
+
+class FrameWriter:
+    """
+    Encodes and writes captured frames on background threads so decoding never waits on disk.
+
+    submit() hands a frame to a bounded queue of at most max_queue frames and blocks while it is full,
+    so memory stays flat however far decoding runs ahead. cv2.imencode releases the GIL, so a few
+    threads keep up with decoding. With threads=0 frames are encoded and written inline, as before.
+    Encode, write and blocked (backpressure) time are recorded for the run summary.
+    """
+
+    def __init__(self, image_format: str = "jpeg", quality: int = 95, threads: int = 2, max_queue: int = 8):
+        image_format = image_format.lower()
+        if image_format not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported output format: {image_format}")
+        self.image_format = image_format
+        self.extension = FORMAT_EXTENSIONS[image_format]
+        self.params = encode_params(image_format, quality)
+        self.frames = 0
+        self.bytes_written = 0
+        self.encode_seconds = 0.0
+        self.write_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.errors: List[Tuple[str, Exception]] = []
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max(max_queue, 1))
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(threads)]
+        for thread in self._threads:
+            thread.start()
+
+    def path(self, folder: str, name: str) -> str:
+        return os.path.join(folder, name + self.extension)
+
+    def submit(self, frame, path: str) -> None:
+        if not self._threads:
+            self._write(frame, path)
+            return
+        start = time.perf_counter()
+        self._queue.put((frame, path))
+        self.blocked_seconds += time.perf_counter() - start
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            self._write(*item)
+
+    def _write(self, frame, path: str) -> None:
+        try:
+            start = time.perf_counter()
+            ok, buffer = cv2.imencode(self.extension, frame, self.params)
+            if not ok:
+                raise ValueError(f"could not encode frame as {self.image_format}")
+            encoded = time.perf_counter()
+            with open(path, "wb") as f:
+                f.write(buffer.tobytes())
+            written = time.perf_counter()
+            with self._lock:
+                self.frames += 1
+                self.bytes_written += len(buffer)
+                self.encode_seconds += encoded - start
+                self.write_seconds += written - encoded
+        except Exception as e:
+            print(f"[ERROR] Writing {path}: {e}")
+            with self._lock:
+                self.errors.append((path, e))
+
+    def close(self) -> None:
+        """
+        Wait for every queued frame to be written.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"frames": self.frames, "bytes": self.bytes_written, "encode_seconds": self.encode_seconds,
+                    "write_seconds": self.write_seconds, "blocked_seconds": self.blocked_seconds,
+                    "errors": len(self.errors)}
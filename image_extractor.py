@@ -1,25 +1,28 @@
 import os
 import json
-import boto3
 import base64
-from PIL import Image
-from io import BytesIO
 import os
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 import csv
 import os
-
-
-model_inference_Id = "XXXXXXXXXXXXX"
-region_name = os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
-
-# Initialize the Bedrock client
-bedrock = boto3.client(
-    "bedrock-runtime",
-    region_name=region_name,
-    aws_access_key_id="XXXXX",
-    aws_secret_access_key="XXXX"
-)
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from answer_codec import MAX_OPTIONS
+from question_tokenizer import option_letters, tokenize_question
+from throttling import RateLimiter, call_with_backoff, error_code
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache, cache_key
+from extraction_output import StreamingResultWriter, take_failed_images
+from image_preprocess import ImagePreprocessor
+from frame_dedup import deduplicate_images
+from domain_classifier import DOMAINS, DomainClassifier
+from extraction_metrics import ExtractionMetrics
+from bedrock_client import get_client
+from bank_ingest import ingest
+
+
+model_inference_Id = os.getenv('BEDROCK_MODEL_ID', "XXXXXXXXXXXXX")
 
 def encode_image_to_base64(path):
     with open(path, "rb") as f:
@@ -37,42 +40,213 @@ def get_media_type(ext: str) -> str:
         return "image/webp"
     raise ValueError(f"Unsupported image extension: {ext}")
 
-def get_bedrock_response_with_image(question: str, image_path: str, max_tokens: int = 8000) -> str:
-    img_b64 = encode_image_to_base64(image_path)
+def image_block(img_bytes: bytes, image_path: str, preprocessor: Optional[ImagePreprocessor] = None) -> Dict:
+    """
+    Message content block for one image, preprocessed if a preprocessor is given.
+    """
     ext = image_path.rsplit(".", 1)[-1]
     media_type = get_media_type(ext)
+    if preprocessor is not None:
+        img_bytes, media_type = preprocessor.process(img_bytes, media_type, os.path.basename(image_path))
+    return {
+        "type": "image",
+        "source": {
+            "type": "base64",
+            "media_type": media_type,
+            "data": base64.b64encode(img_bytes).decode("utf-8")
+        }
+    }
+
 
+def invoke_model(content: List[Dict], max_tokens: int = 8000, client=None, stats: Optional[Dict] = None) -> Dict:
+    """
+    Send one user message and return the decoded response body (content blocks and token usage).
+    With stats, request/response body sizes and the call time are added to its
+    payload_bytes, response_bytes and request_seconds.
+    """
     body = {
         "anthropic_version": "bedrock-2023-05-31",
         "max_tokens": max_tokens,
         "messages": [
             {
                 "role": "user",
-                "content": [
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": img_b64
-                        }
-                    },
-                    {
-                        "type": "text",
-                        "text": question
-                    }
-                ]
+                "content": content
             }
         ]
     }
 
-    response = bedrock.invoke_model(
-        body=json.dumps(body),
-        modelId=model_inference_Id,
-        accept='application/json',
-        contentType='application/json'
-    )
-    resp = json.loads(response['body'].read())
+    payload = json.dumps(body)
+    start = time.perf_counter()
+    try:
+        response = (client or get_client()).invoke_model(
+            body=payload,
+            modelId=model_inference_Id,
+            accept='application/json',
+            contentType='application/json'
+        )
+        raw = response['body'].read()
+    finally:
+        if stats is not None:
+            stats["request_seconds"] += time.perf_counter() - start
+            stats["payload_bytes"] += len(payload)
+    if stats is not None:
+        stats["response_bytes"] += len(raw)
+    return json.loads(raw)
+
+
+def request_cache_key(img_bytes: bytes, question: str, max_tokens: int,
+                      preprocessor: Optional[ImagePreprocessor] = None) -> str:
+    variant = preprocessor.signature() if preprocessor is not None else ""
+    return cache_key(img_bytes, question, model_inference_Id, max_tokens, variant)
+
+
+class CostReport:
+    """
+    Token usage and latency per model request, to compare single-image and batched extraction.
+    Safe to share between extraction threads.
+    """
+
+    def __init__(self):
+        self.requests: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, images: int, latency: float, usage: Optional[Dict]) -> None:
+        usage = usage or {}
+        with self._lock:
+            self.requests.append({
+                "kind": kind,
+                "images": images,
+                "latency": latency,
+                "input_tokens": usage.get("input_tokens", 0),
+                "output_tokens": usage.get("output_tokens", 0),
+            })
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            requests = list(self.requests)
+        summary = {}
+        for kind in sorted({r["kind"] for r in requests}):
+            rows = [r for r in requests if r["kind"] == kind]
+            images = sum(r["images"] for r in rows)
+            summary[kind] = {
+                "requests": len(rows),
+                "images": images,
+                "input_tokens_per_image": sum(r["input_tokens"] for r in rows) / images,
+                "output_tokens_per_image": sum(r["output_tokens"] for r in rows) / images,
+                "latency_per_image": sum(r["latency"] for r in rows) / images,
+            }
+        return summary
+
+    def print_summary(self) -> None:
+        for kind, row in self.summary().items():
+            print(f"{kind:>6} requests: {row['requests']} for {row['images']} images, per image "
+                  f"{row['input_tokens_per_image']:.0f} input / {row['output_tokens_per_image']:.0f} output tokens, "
+                  f"{row['latency_per_image']:.2f}s")
+
+
+def get_bedrock_response_with_image(question: str, image_path: str, max_tokens: int = 8000, client=None,
+                                    cache: Optional[ResponseCache] = None,
+                                    rate_limiter: Optional[RateLimiter] = None,
+                                    preprocessor: Optional[ImagePreprocessor] = None,
+                                    report: Optional[CostReport] = None,
+                                    record: Optional[Dict] = None,
+                                    image_bytes: Optional[bytes] = None) -> str:
+    """
+    Send one image plus the prompt to the model and return the response text.
+    client defaults to the shared client from bedrock_client.get_client(), created on first use;
+    pass any object with a compatible invoke_model() (e.g. fake_bedrock.FakeBedrock) to run without AWS.
+    With a cache, a response already stored for the same image bytes, prompt, model and max_tokens
+    is returned immediately without a request (and without waiting on the rate limiter).
+    With a preprocessor, the image is downscaled/re-encoded in memory before upload.
+    With a record from ExtractionMetrics.start(), stage timings and byte counts are added to it.
+    With image_bytes, the image is taken from memory and image_path only names it (and its format).
+    """
+    start = time.perf_counter()
+    if image_bytes is not None:
+        img_bytes = image_bytes
+    else:
+        with open(image_path, "rb") as f:
+            img_bytes = f.read()
+
+    key = None
+    if cache is not None:
+        key = request_cache_key(img_bytes, question, max_tokens, preprocessor)
+        cached = cache.get(key)
+        if cached is not None:
+            if record is not None:
+                record["cached"] = True
+                record["encode_seconds"] += time.perf_counter() - start
+            return cached
+
+    content = [image_block(img_bytes, image_path, preprocessor), {"type": "text", "text": question}]
+    if record is not None:
+        record["encode_seconds"] += time.perf_counter() - start
+
+    if rate_limiter is not None:
+        start = time.perf_counter()
+        rate_limiter.acquire()
+        if record is not None:
+            record["wait_seconds"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    resp = invoke_model(content, max_tokens, client, stats=record)
+    if report is not None:
+        report.record("single", 1, time.perf_counter() - start, resp.get('usage'))
+    text = resp['content'][0]['text']
+
+    # Only keep responses we could parse; a malformed one should be retried on the next run
+    if cache is not None and extract_dict_from_response(text) is not None:
+        cache.put(key, text)
+    return text
+
+
+BATCH_INSTRUCTIONS = (
+    "This request contains {n} images, each preceded by its label 'Image 1' to 'Image {n}'. "
+    "Apply the instructions above to every image separately. "
+    "Your response must be a valid JSON array with exactly {n} objects, one per image and in the same order, "
+    "each with the structure given above"
+)
+
+
+def get_bedrock_response_with_images(question: str, image_paths: List[str], max_tokens: int = 8000, client=None,
+                                     rate_limiter: Optional[RateLimiter] = None,
+                                     preprocessor: Optional[ImagePreprocessor] = None,
+                                     report: Optional[CostReport] = None,
+                                     records: Optional[List[Dict]] = None) -> str:
+    """
+    Send several images with one copy of the prompt and ask for a JSON array of results,
+    so the long prompt is paid once per batch instead of once per image.
+    records, if given, holds one metrics record per image: each image gets its own encode time,
+    the whole wait and request time, and an even share of the request/response bytes.
+    """
+    content = []
+    for i, image_path in enumerate(image_paths, 1):
+        start = time.perf_counter()
+        with open(image_path, "rb") as f:
+            img_bytes = f.read()
+        content.append({"type": "text", "text": f"Image {i}:"})
+        content.append(image_block(img_bytes, image_path, preprocessor))
+        if records is not None:
+            records[i - 1]["encode_seconds"] += time.perf_counter() - start
+    content.append({"type": "text", "text": question + "\n" + BATCH_INSTRUCTIONS.format(n=len(image_paths))})
+
+    if rate_limiter is not None:
+        start = time.perf_counter()
+        rate_limiter.acquire()
+        for record in records or []:
+            record["wait_seconds"] += time.perf_counter() - start
+
+    stats = {"request_seconds": 0.0, "payload_bytes": 0, "response_bytes": 0}
+    try:
+        resp = invoke_model(content, max_tokens, client, stats=stats)
+    finally:
+        for record in records or []:
+            record["request_seconds"] += stats["request_seconds"]
+            record["payload_bytes"] += stats["payload_bytes"] // len(image_paths)
+            record["response_bytes"] += stats["response_bytes"] // len(image_paths)
+            record["batch_size"] = len(image_paths)
+    if report is not None:
+        report.record("batch", len(image_paths), stats["request_seconds"], resp.get('usage'))
     return resp['content'][0]['text']
 
 
@@ -93,127 +267,339 @@ def extract_dict_from_response(response: str) -> Optional[Dict]:
     except (json.JSONDecodeError, AttributeError):
         return None
 
-def process_images_in_folder(folder_path: str) -> List[Dict[str, str]]:
+
+def extract_list_from_response(response: str, expected: int) -> Optional[List[Optional[Dict]]]:
     """
-    Process all images in a specified folder, extracting text explanations from each image.
-    Returns a list of dictionaries containing the question-answer pairs for each image.
+    Extracts a JSON array of exactly `expected` entries from a batch response, by finding the first [ and last ].
+    Entries that are not objects come back as None. Returns None if there is no such array, since the
+    entries of a list of the wrong length cannot be matched to their images.
     """
-    domains =  """
-            Domain 1: SDLC Automation
-        CI/CD Pipelines: Set up build, test, and deployment automation (CodeBuild, CodeDeploy, Secrets Manager).
-
-        Automated Testing: Integrate unit, integration, and security tests in pipelines.
-
-        Artifact Management: Securely store and manage build artifacts (S3, ECR, CodeArtifact).
-
-        Deployment Strategies: Implement blue/green, canary, and immutable deployments for EC2, containers, and serverless.
-
-        Domain 2: Configuration Management & IaC
-        IaC: Use CloudFormation, CDK, or SAM to automate infrastructure.
-
-        Multi-Account Automation: Manage accounts with AWS Organizations, Control Tower, and IAM policies.
-
-        Large-Scale Automation: Automate patching, compliance, and workflows using Systems Manager & Lambda.
-
-        Domain 3: Resilient Cloud Solutions
-        High Availability: Multi-AZ/multi-Region setups, failover, and load balancing.
+    try:
+        start = response.find('[')
+        end = response.rfind(']')
+        if start == -1 or end == -1:
+            return None
+        items = json.loads(response[start:end+1])
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    if not isinstance(items, list) or len(items) != expected:
+        return None
+    return [item if isinstance(item, dict) else None for item in items]
 
-        Scalability: Auto Scaling, serverless, and containerized workloads (ECS, EKS).
 
-        Disaster Recovery: Backup strategies, RTO/RPO compliance, and automated recovery.
+def build_result(filename: str, image_path: str, raw_response: str,
+                 classifier: Optional[DomainClassifier] = None) -> Dict[str, str]:
+    """
+    Turn a model response for one image into a result dict, or a dict with an 'error' key.
+    With a classifier, domain_class is assigned locally from the question text; a domain the model
+    returned anyway is kept as model_domain_class (written to the .jsonl, not the CSV).
+    """
+    # Extract the dictionary from the response
+    response_dict = extract_dict_from_response(str(raw_response))
+    
+    if not response_dict:
+        print(f"[WARNING] No valid JSON found in response for {filename}")
+        return {
+            'image': filename,
+            'image_path': image_path,
+            'error': 'Invalid response format - no JSON found'
+        }
+        
+    # Validate we got the expected structure
+    required_keys = ['question_and_options', 'answer'] if classifier is not None else ['question_and_options', 'answer','domain_class']
+    if not all(key in response_dict for key in required_keys):
+        print(f"[WARNING] Missing required keys in response for {filename}")
+        return {
+            'image': filename,
+            'image_path': image_path,
+            'error': 'Invalid response format - missing keys',
+            'raw_response': str(raw_response)[:200] + '...'  # Store truncated raw response
+        }
+        
+    # Check the extracted block splits into a stem and lettered options the app can display
+    _, options = tokenize_question(str(response_dict['question_and_options']))
+    if not options:
+        print(f"[WARNING] No lettered options found in question for {filename}")
+    elif len(options) > MAX_OPTIONS:
+        print(f"[WARNING] {len(options)} options in question for {filename}; at most {MAX_OPTIONS} can be stored")
+    elif not set(str(response_dict['answer'])) & set(option_letters(options)):
+        print(f"[WARNING] Answer {response_dict['answer']} does not match options {option_letters(options)} for {filename}")
+
+    # Successful processing
+    result = {
+        'question_and_options': response_dict['question_and_options'],
+        'answer': response_dict['answer'],
+        'domain_class':response_dict.get('domain_class')
+    }
+    if classifier is not None:
+        result['domain_class'] = classifier.classify(str(response_dict['question_and_options']),
+                                                     str(response_dict['answer']))
+        if 'domain_class' in response_dict:
+            result['model_domain_class'] = response_dict['domain_class']
+        if not result['domain_class']:
+            print(f"[WARNING] Could not classify the domain of {filename}")
+    print(f"[SUCCESS] Processed {filename}")
+    return result
+
+
+def process_image(filename: str, image_path: str, prompt: str, client=None, max_retries: int = 5,
+                  rate_limiter: Optional[RateLimiter] = None, cache: Optional[ResponseCache] = None,
+                  preprocessor: Optional[ImagePreprocessor] = None,
+                  report: Optional[CostReport] = None,
+                  classifier: Optional[DomainClassifier] = None,
+                  record: Optional[Dict] = None,
+                  image_bytes: Optional[bytes] = None) -> Dict[str, str]:
+    """
+    Extract the question from one image, read from image_path or passed in memory as image_bytes.
+    Returns the result dict, or a dict with an 'error' key.
+    """
+    def request():
+        return get_bedrock_response_with_image(prompt, image_path, client=client, cache=cache,
+                                               rate_limiter=rate_limiter, preprocessor=preprocessor, report=report,
+                                               record=record, image_bytes=image_bytes)
 
-        Domain 4: Monitoring & Logging
-        Log & Metric Collection: Use CloudWatch, Kinesis, and X-Ray for monitoring.
+    def log_retry(attempt, error, delay):
+        if record is not None:
+            record["retries"] += 1
+        print(f"[RETRY] {filename}: {error_code(error)}, attempt {attempt}/{max_retries}, waiting {delay:.1f}s")
 
-        Analysis & Alerts: Create dashboards, detect anomalies, and set up alarms.
+    print(f"\n* Processing: {filename}")
+    
+    try:
+        raw_response = call_with_backoff(request, max_retries=max_retries, on_retry=log_retry)
+        start = time.perf_counter()
+        result = build_result(filename, image_path, raw_response, classifier)
+        if record is not None:
+            record["parse_seconds"] += time.perf_counter() - start
+        return result
+        
+    except Exception as e:
+        if record is not None:
+            record["reason"] = error_code(e)
+        print(f"[ERROR] Processing {filename}: {str(e)}")
+        return {
+            'image': filename,
+            'image_path': image_path,
+            'error': str(e)
+        }
+
+
+def process_batch(filenames: List[str], folder_path: str, prompt: str, client=None, max_retries: int = 5,
+                  rate_limiter: Optional[RateLimiter] = None, cache: Optional[ResponseCache] = None,
+                  preprocessor: Optional[ImagePreprocessor] = None,
+                  report: Optional[CostReport] = None, max_tokens: int = 8000,
+                  classifier: Optional[DomainClassifier] = None,
+                  records: Optional[Dict[str, Dict]] = None) -> List[Dict[str, str]]:
+    """
+    Extract several images with one request. Cached images are answered from the cache. If the
+    batch request fails or its response is not a JSON array with one entry per image, every image
+    sent in the batch falls back to a single-image call; otherwise only the images whose entry is
+    malformed do. Results are returned in the order of filenames.
+    records maps filenames to their ExtractionMetrics records, which mark fallbacks.
+    """
+    records = records or {}
+    results: Dict[str, Dict[str, str]] = {}
+    keys: Dict[str, str] = {}
+    pending = []
+    for filename in filenames:
+        image_path = os.path.join(folder_path, filename)
+        if cache is not None:
+            with open(image_path, "rb") as f:
+                keys[filename] = request_cache_key(f.read(), prompt, max_tokens, preprocessor)
+            cached = cache.get(keys[filename])
+            if cached is not None:
+                if filename in records:
+                    records[filename]["cached"] = True
+                results[filename] = build_result(filename, image_path, cached, classifier)
+                continue
+        pending.append(filename)
 
-        Automation: Trigger actions via EventBridge, SNS, and Lambda for event-driven responses.
+    batch_records = [records[filename] for filename in pending] if records else None
 
-        Domain 5: Incident & Event Response
-        Event Processing: Use EventBridge, SQS, and Step Functions for workflows.
+    def log_retry(attempt, error, delay):
+        for record in batch_records or []:
+            record["retries"] += 1
+        print(f"[RETRY] batch of {len(pending)}: {error_code(error)}, attempt {attempt}/{max_retries}, waiting {delay:.1f}s")
 
-        Automated Remediation: Fix issues with Systems Manager and AWS Config.
+    items = None
+    if len(pending) > 1:
+        print(f"\n* Processing batch: {', '.join(pending)}")
+        paths = [os.path.join(folder_path, filename) for filename in pending]
+        try:
+            raw_response = call_with_backoff(
+                lambda: get_bedrock_response_with_images(prompt, paths, max_tokens, client=client,
+                                                         rate_limiter=rate_limiter, preprocessor=preprocessor,
+                                                         report=report, records=batch_records),
+                max_retries=max_retries,
+                on_retry=log_retry
+            )
+            items = extract_list_from_response(raw_response, len(pending))
+            if items is None:
+                print(f"[WARNING] Malformed batch response; retrying {len(pending)} images one at a time")
+        except Exception as e:
+            print(f"[WARNING] Batch request failed ({e}); retrying {len(pending)} images one at a time")
 
-        Troubleshooting: Analyze failures using CloudWatch, X-Ray, and deployment logs.
+    fallback = []
+    for filename, item in zip(pending, items or [None] * len(pending)):
+        if item is None:
+            fallback.append(filename)
+            continue
+        text = json.dumps(item)
+        start = time.perf_counter()
+        result = build_result(filename, os.path.join(folder_path, filename), text, classifier)
+        if filename in records:
+            records[filename]["parse_seconds"] += time.perf_counter() - start
+        if 'error' in result:
+            fallback.append(filename)
+            continue
+        results[filename] = result
+        # Cache under the single-image key so later runs (batched or not) reuse it
+        if cache is not None:
+            cache.put(keys[filename], text)
+    if items is not None and fallback:
+        print(f"[WARNING] {len(fallback)} malformed results in batch; retrying {', '.join(fallback)} one at a time")
+
+    for filename in fallback:
+        if filename in records and len(pending) > 1:
+            records[filename]["fallback"] = True
+        results[filename] = process_image(filename, os.path.join(folder_path, filename), prompt,
+                                          client=client, max_retries=max_retries, rate_limiter=rate_limiter,
+                                          cache=cache, preprocessor=preprocessor, report=report,
+                                          classifier=classifier, record=records.get(filename))
+    return [results[filename] for filename in filenames]
+
+
+# The prompt is sent as str() of this tuple; keep it stable so cached responses stay valid.
+# domain_class is assigned locally by DomainClassifier, so the prompt no longer carries the domain list.
+PROMPT = (
+    "the image comprieses of a question, along with multiple choice questiong and a correct answer, extract the question, multiple choice options and correct answer ",
+    "Your response must be a valid JSON object with a question along with its multiple cloices and the answer",
+    "the structure {'question_and_options': '...', 'answer': '...'}",
+)
 
-        Domain 6: Security & Compliance
-        IAM at Scale: Least privilege, role-based access, and automated credential rotation.
+# Original prompt that also asks the model for the domain (--model-domains), e.g. to check the classifier
+PROMPT_WITH_DOMAINS = (
+    "the image comprieses of a question, along with multiple choice questiong and a correct answer, extract the question, multiple choice options and correct answer ",
+    "classify the question along with its multiple choice options, and match it to the closest domain from the 6 domains",
+    "Your response must be a valid JSON object with a question along with its multiple cloices, the answer and the domain class",
+    "the structure {'question_and_options': '...', 'answer': '...','domain_class':'..'}",
+    rf"domains = --start domains--{DOMAINS} --end domains--"
+)
 
-        Security Automation: Enforce controls via Security Hub, WAF, KMS, and Macie.
 
-        Auditing & Monitoring: Track threats with GuardDuty, Inspector, and CloudTrail.
+def iter_process_images(folder_path: str, concurrency: int = 1, requests_per_second: Optional[float] = None,
+                        max_retries: int = 5, client=None, cache: Optional[ResponseCache] = None,
+                        skip: Optional[Set[str]] = None, only: Optional[Set[str]] = None,
+                        preprocessor: Optional[ImagePreprocessor] = None,
+                        dedup_threshold: Optional[int] = None, batch_size: int = 1,
+                        report: Optional[CostReport] = None,
+                        model_domains: bool = False,
+                        metrics: Optional[ExtractionMetrics] = None) -> Iterator[Tuple[str, Dict[str, str]]]:
     """
-
-    prompt = (
-        "the image comprieses of a question, along with multiple choice questiong and a correct answer, extract the question, multiple choice options and correct answer ",
-        "classify the question along with its multiple choice options, and match it to the closest domain from the 6 domains",
-        "Your response must be a valid JSON object with a question along with its multiple cloices, the answer and the domain class",
-        "the structure {'question_and_options': '...', 'answer': '...','domain_class':'..'}",
-        rf"domains = --start domains--{domains} --end domains--"
-    )
-    
-    responses = []
-    supported_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+    Process the images in a folder and yield (filename, result) pairs in sorted filename order,
+    each as soon as it (and every image before it) has finished.
+
+    Up to `concurrency` images are in flight at once, `requests_per_second` caps the request rate
+    across all of them, and throttled requests are retried up to `max_retries` times with
+    exponential backoff. With a cache, images whose response is already stored are not sent again.
+    Filenames in `skip` are left out; if `only` is given, just those filenames are processed.
+    A preprocessor shrinks each image before upload and the bytes saved are reported at the end.
+    With dedup_threshold, runs of consecutive frames whose perceptual hashes are within that many bits
+    (of 256) of the previous frame are grouped and only the first frame of each group is extracted.
+    With batch_size > 1, consecutive images are sent `batch_size` at a time in one request (see
+    process_batch); each batch counts as one request against the rate limit and the concurrency.
+    A report collects token usage and latency per request and prints per-image averages at the end.
+    domain_class is assigned by the local DomainClassifier; with model_domains the original prompt,
+    which also asks the model for the domain, is sent and the model's answer kept as model_domain_class.
+    With metrics, every image's stage timings, bytes, retries and outcome are recorded and summarised at the end.
+    """
+    supported_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
     
     if not os.path.isdir(folder_path):
         print(f"[ERROR] Invalid folder path: {folder_path}")
-        return responses
+        return
     
     print(f"\nProcessing images in: {folder_path}")
     
-    for filename in sorted(os.listdir(folder_path)):
-        if not filename.lower().endswith(supported_extensions):
-            continue
-            
-        image_path = os.path.join(folder_path, filename)
-        print(f"\n* Processing: {filename}")
-        
-        try:
-            raw_response = get_bedrock_response_with_image(str(prompt), image_path)
-            
-            # Extract the dictionary from the response
-            response_dict = extract_dict_from_response(str(raw_response))
-            
-            if not response_dict:
-                print(f"[WARNING] No valid JSON found in response for {filename}")
-                responses.append({
-                    'image': filename,
-                    'image_path': image_path,
-                    'error': 'Invalid response format - no JSON found'
-                })
-                continue
-                
-            # Validate we got the expected structure
-            if not all(key in response_dict for key in ['question_and_options', 'answer','domain_class']):
-                print(f"[WARNING] Missing required keys in response for {filename}")
-                responses.append({
-                    'image': filename,
-                    'image_path': image_path,
-                    'error': 'Invalid response format - missing keys',
-                    'raw_response': str(raw_response)[:200] + '...'  # Store truncated raw response
-                })
-                continue
-                
-            # Successful processing
-            result = {
-                'question_and_options': response_dict['question_and_options'],
-                'answer': response_dict['answer'],
-                'domain_class':response_dict['domain_class']
-            }
-            responses.append(result)
-            print(f"[SUCCESS] Processed {filename}")
-            
-        except Exception as e:
-            print(f"[ERROR] Processing {filename}: {str(e)}")
-            responses.append({
-                'image': filename,
-                'image_path': image_path,
-                'error': str(e)
-            })
+    filenames = [f for f in sorted(os.listdir(folder_path)) if f.lower().endswith(supported_extensions)]
+    if only is not None:
+        filenames = [f for f in filenames if f in only]
+    if dedup_threshold is not None:
+        # Group the full list before dropping completed images, so a resumed run picks the same
+        # representatives and a completed one still covers its duplicates
+        representatives, _ = deduplicate_images(folder_path, filenames, dedup_threshold)
+        print(f"Dedup: {len(filenames)} images in {len(representatives)} groups, "
+              f"{len(filenames) - len(representatives)} extraction calls avoided")
+        filenames = representatives
+    if skip:
+        remaining = [f for f in filenames if f not in skip]
+        if len(remaining) < len(filenames):
+            print(f"Skipping {len(filenames) - len(remaining)} images already completed")
+        filenames = remaining
+    rate_limiter = RateLimiter(requests_per_second, burst=concurrency) if requests_per_second else None
+
+    prompt = str(PROMPT_WITH_DOMAINS if model_domains else PROMPT)
+    classifier = DomainClassifier()
+    batch_size = max(batch_size, 1)
+    batches = [filenames[i:i + batch_size] for i in range(0, len(filenames), batch_size)]
+
+    def run(batch):
+        records = {filename: metrics.start(filename) for filename in batch} if metrics is not None else {}
+        if len(batch) == 1:
+            results = [process_image(batch[0], os.path.join(folder_path, batch[0]), prompt,
+                                     client=client, max_retries=max_retries, rate_limiter=rate_limiter, cache=cache,
+                                     preprocessor=preprocessor, report=report, classifier=classifier,
+                                     record=records.get(batch[0]))]
+        else:
+            results = process_batch(batch, folder_path, prompt, client=client, max_retries=max_retries,
+                                    rate_limiter=rate_limiter, cache=cache, preprocessor=preprocessor, report=report,
+                                    classifier=classifier, records=records)
+        for filename, result in zip(batch, results):
+            if filename in records:
+                metrics.finish(records[filename], result)
+        return results
+
+    processed = 0
+    if concurrency <= 1:
+        for batch in batches:
+            for filename, result in zip(batch, run(batch)):
+                yield filename, result
+                processed += 1
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # map() yields results in submission order, so the output order stays deterministic
+            for batch, results in zip(batches, pool.map(run, batches)):
+                for filename, result in zip(batch, results):
+                    yield filename, result
+                    processed += 1
     
-    print(f"\nCompleted. Processed {len(responses)} images.")
-    print(responses)
-    return responses
+    print(f"\nCompleted. Processed {processed} images.")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses")
+    if preprocessor is not None:
+        summary = preprocessor.summary()
+        print(f"Preprocessing: {summary['images']} images, {summary['bytes_in'] / 1e6:.1f} MB -> "
+              f"{summary['bytes_out'] / 1e6:.1f} MB ({summary['bytes_saved'] / 1e6:.1f} MB saved)")
+    if report is not None:
+        report.print_summary()
+    if metrics is not None:
+        metrics.print_summary()
+
+
+def process_images_in_folder(folder_path: str, concurrency: int = 1, requests_per_second: Optional[float] = None,
+                             max_retries: int = 5, client=None,
+                             cache: Optional[ResponseCache] = None, batch_size: int = 1,
+                             metrics: Optional[ExtractionMetrics] = None) -> List[Dict[str, str]]:
+    """
+    Process all images in a specified folder, extracting text explanations from each image.
+    Returns a list of dictionaries containing the question-answer pairs for each image,
+    in sorted filename order. See iter_process_images for the options; use it directly
+    to stream results instead of holding them all in memory.
+    """
+    return [result for _, result in iter_process_images(
+        folder_path, concurrency=concurrency, requests_per_second=requests_per_second,
+        max_retries=max_retries, client=client, cache=cache, batch_size=batch_size, metrics=metrics)]
 
 def save_results_to_csv(results, csv_file_path):
     # Filter out items with an 'error' key
@@ -226,7 +612,7 @@ def save_results_to_csv(results, csv_file_path):
 
     # Write valid results to CSV
     with open(csv_file_path, mode='w', newline='', encoding='utf-8') as file:
-        writer = csv.DictWriter(file, fieldnames=['question_and_options', 'answer', 'domain_class'])
+        writer = csv.DictWriter(file, fieldnames=['question_and_options', 'answer', 'domain_class'], extrasaction='ignore')
         writer.writeheader()
         for item in valid_results:
             writer.writerow(item)
@@ -235,10 +621,74 @@ def save_results_to_csv(results, csv_file_path):
 
 # Example usage
 if __name__ == "__main__":
-    
-    # path to images
-    base = os.getcwd()
-    results = process_images_in_folder("folderpath")
-    save_results_to_csv(results,"folderpath"+rf"\csv.csv")
-
-
+    parser = argparse.ArgumentParser(description="Extract exam questions from images with Bedrock")
+    parser.add_argument("folder", nargs="?", default="folderpath", help="path to images")
+    parser.add_argument("--output", help="CSV to append to (default: <folder>/csv.csv); the .jsonl, .done "
+                                         "manifest, .errors.jsonl and .metrics.json/.metrics.prom files are "
+                                         "written next to it")
+    parser.add_argument("--concurrency", type=int, default=1, help="images in flight at once")
+    parser.add_argument("--rps", type=float, help="max Bedrock requests per second across all threads")
+    parser.add_argument("--max-retries", type=int, default=5, help="retries per image on throttling")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="SQLite file for cached model responses")
+    parser.add_argument("--no-cache", action="store_true", help="always call the model")
+    parser.add_argument("--cache-max-entries", type=int, help="keep at most this many cached responses")
+    parser.add_argument("--cache-max-age-days", type=float, help="ignore and drop cached responses older than this")
+    parser.add_argument("--max-dimension", type=int, help="downscale images so the longest side is at most this")
+    parser.add_argument("--grayscale", action="store_true", help="convert images to grayscale before upload")
+    parser.add_argument("--image-format", choices=["jpeg", "webp", "png"], help="re-encode images in this format")
+    parser.add_argument("--quality", type=int, default=80, help="JPEG/WebP quality when re-encoding")
+    parser.add_argument("--dedup-threshold", type=int,
+                        help="skip frames within this many bits (of 256) of the previous frame's perceptual hash, "
+                             "e.g. 10 (checked by benchmarks/bench_frame_dedup.py)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="images per model request; malformed batch responses fall back to one image per request")
+    parser.add_argument("--model-domains", action="store_true",
+                        help="also ask the model for the domain (original prompt), kept as model_domain_class in the .jsonl")
+    parser.add_argument("--merge-into", metavar="BANKS_DIR",
+                        help="append new, non-duplicate questions from this run to the per-domain banks in BANKS_DIR")
+    parser.add_argument("--retry-errors", action="store_true", help="only reprocess images from the error log")
+    parser.add_argument("--restart", action="store_true",
+                        help="process every image again; the previous outputs and manifest are moved aside to .prev")
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        max_age = args.cache_max_age_days * 86400 if args.cache_max_age_days else None
+        cache = ResponseCache(args.cache, max_entries=args.cache_max_entries, max_age_seconds=max_age)
+
+    preprocessor = None
+    if args.max_dimension or args.grayscale or args.image_format:
+        preprocessor = ImagePreprocessor(max_dimension=args.max_dimension, grayscale=args.grayscale,
+                                         image_format=args.image_format or "jpeg", quality=args.quality)
+
+    output = args.output or os.path.join(args.folder, "csv.csv")
+    only = take_failed_images(output) if args.retry_errors else None
+    metrics = ExtractionMetrics()
+    extracted = []
+    with StreamingResultWriter(output, restart=args.restart) as writer:
+        skip = writer.completed()
+        # Each result is on disk (and checkpointed) before the next one is taken
+        for filename, result in iter_process_images(args.folder, concurrency=args.concurrency,
+                                                    requests_per_second=args.rps, max_retries=args.max_retries,
+                                                    cache=cache, skip=skip, only=only,
+                                                    preprocessor=preprocessor,
+                                                    dedup_threshold=args.dedup_threshold,
+                                                    batch_size=args.batch_size, report=CostReport(),
+                                                    model_domains=args.model_domains, metrics=metrics):
+            writer.write(filename, result)
+            if args.merge_into and 'error' not in result:
+                extracted.append(result)
+    print(f"Saved {writer.written} results to {output}; {writer.failed} failures logged to {writer.errors_path}")
+    metrics_stem = os.path.splitext(output)[0] + ".metrics"
+    metrics.write(metrics_stem + ".json", metrics_stem + ".prom")
+    print(f"Metrics written to {metrics_stem}.json and {metrics_stem}.prom")
+
+    if args.merge_into:
+        merged = ingest(extracted, args.merge_into)
+        print(f"Merged into {args.merge_into}: {sum(merged['added'].values())} added, "
+              f"{len(merged['duplicates'])} duplicates, {len(merged['rejected'])} rejected")
+
+    if cache is not None:
+        removed = cache.evict()
+        if removed:
+            print(f"Evicted {removed} cached responses")
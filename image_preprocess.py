@@ -0,0 +1,78 @@
+import threading
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+FORMAT_MEDIA_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "PNG": "image/png",
+}
+
+
+class ImagePreprocessor:
+    """
+    Shrinks images in memory before upload: downscale so the longest side is at most max_dimension,
+    optionally convert to grayscale, and re-encode as JPEG/WebP/PNG at the given quality.
+    Question text stays readable well below full video resolution, so this mostly cuts upload size
+    and input tokens. If re-encoding would not make an image smaller, the original bytes are sent.
+    Bytes before/after are recorded per image; safe to share between extraction threads.
+    """
+
+    def __init__(self, max_dimension: Optional[int] = 1600, grayscale: bool = False,
+                 image_format: str = "JPEG", quality: int = 80):
+        image_format = image_format.upper()
+        if image_format not in FORMAT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported output format: {image_format}")
+        self.max_dimension = max_dimension
+        self.grayscale = grayscale
+        self.image_format = image_format
+        self.quality = quality
+        self.records: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def signature(self) -> str:
+        """
+        Settings that change the uploaded bytes; part of the response cache key.
+        """
+        return f"preprocess:{self.max_dimension}:{int(self.grayscale)}:{self.image_format}:{self.quality}"
+
+    def process(self, image_bytes: bytes, media_type: str, name: str = "") -> Tuple[bytes, str]:
+        """
+        Return (bytes to upload, media type).
+        """
+        with Image.open(BytesIO(image_bytes)) as img:
+            img.load()
+            if self.max_dimension and max(img.size) > self.max_dimension:
+                img.thumbnail((self.max_dimension, self.max_dimension), Image.LANCZOS)
+            if self.grayscale:
+                img = img.convert("L")
+            elif img.mode not in ("RGB", "L") and self.image_format == "JPEG":
+                img = img.convert("RGB")
+
+            buffer = BytesIO()
+            save_kwargs = {"optimize": True}
+            if self.image_format in ("JPEG", "WEBP"):
+                save_kwargs["quality"] = self.quality
+            img.save(buffer, format=self.image_format, **save_kwargs)
+            processed = buffer.getvalue()
+
+        if len(processed) < len(image_bytes):
+            output, output_type = processed, FORMAT_MEDIA_TYPES[self.image_format]
+        else:
+            output, output_type = image_bytes, media_type
+
+        with self._lock:
+            self.records.append({"image": name, "bytes_in": len(image_bytes), "bytes_out": len(output)})
+        saved = len(image_bytes) - len(output)
+        print(f"[PREPROCESS] {name}: {len(image_bytes) / 1024:.0f} KB -> {len(output) / 1024:.0f} KB "
+              f"({saved / max(len(image_bytes), 1):.0%} saved)")
+        return output, output_type
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            bytes_in = sum(r["bytes_in"] for r in self.records)
+            bytes_out = sum(r["bytes_out"] for r in self.records)
+            return {"images": len(self.records), "bytes_in": bytes_in, "bytes_out": bytes_out,
+                    "bytes_saved": bytes_in - bytes_out}
@@ -0,0 +1,290 @@
+import csv
+import hashlib
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+from answer_codec import MAX_OPTIONS, letters_to_mask
+from question_tokenizer import normalize_answer, option_letters, tokenize_question
+
+# The banks shipped with the app, found from this file so the app starts from any working directory.
+DEFAULT_BANKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "domainQuestions")
+# Compiled banks live next to the CSVs they were built from.
+CACHE_DIR_NAME = ".bankcache"
+# Bump whenever the parsed question layout changes so stale caches get rebuilt.
+CACHE_FORMAT_VERSION = 5
+
+
+# Helper to extract question and options
+def extract_question_and_options(text):
+    return tokenize_question(text)
+
+
+# Function to parse questions
+def parse_questions_from_csv(file_path):
+    """
+    Parse a bank CSV. Rows with more than MAX_OPTIONS options, or whose answer is not a non-empty set
+    of the question's option letters, are logged and skipped, so one bad row cannot take the whole domain down.
+    """
+    questions = []
+    with open(file_path, mode='r', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        for line, row in enumerate(reader, start=2):
+            question_text, options = extract_question_and_options(row.get("question") or "")
+            if len(options) > MAX_OPTIONS:
+                print(f"[WARNING] Skipping {os.path.basename(file_path)} line {line}: {len(options)} options, "
+                      f"at most {MAX_OPTIONS} can be stored")
+                continue
+            raw_answer = row.get("answer") or ""
+            answer = normalize_answer(raw_answer, options)  # e.g., "AB", "D", "BDF"
+            try:
+                answer_mask = letters_to_mask(answer)
+            except ValueError:
+                answer = ""
+            if not answer:
+                print(f"[WARNING] Skipping {os.path.basename(file_path)} line {line}: answer {raw_answer!r} "
+                      f"is not a set of the options {option_letters(options)!r}")
+                continue
+            question_entry = {
+                "question": question_text.strip(),
+                "options": options,
+                "answer": answer,
+                "answer_mask": answer_mask,
+            }
+            questions.append(question_entry)
+    return questions
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def get_cache_path(csv_path: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Location of the compiled bank for csv_path.
+    Defaults to a .bankcache folder beside the CSV.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME)
+    return os.path.join(cache_dir, os.path.basename(csv_path) + ".bank")
+
+
+def _read_compiled(cache_path: str) -> Optional[Dict]:
+    # One bulk read of the whole file, then a single unpickle.
+    try:
+        with open(cache_path, "rb") as f:
+            compiled = pickle.loads(f.read())
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(compiled, dict) or compiled.get("version") != CACHE_FORMAT_VERSION:
+        return None
+    return compiled
+
+
+def _write_compiled(cache_path: str, compiled: Dict) -> None:
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # Write to a temp file and swap it in so concurrent readers never see a partial bank.
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pickle.dumps(compiled, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(tmp_path, cache_path)
+
+
+def _ensure_compiled(csv_path: str, cache_dir: Optional[str] = None):
+    """
+    Return (compiled bank, rebuilt flag) for csv_path.
+    The CSV size and mtime are checked first; the content hash is only computed when they differ,
+    so touching a file without editing it does not trigger a reparse.
+    """
+    cache_path = get_cache_path(csv_path, cache_dir)
+    stat = os.stat(csv_path)
+    compiled = _read_compiled(cache_path)
+
+    if compiled and compiled["size"] == stat.st_size and compiled["mtime_ns"] == stat.st_mtime_ns:
+        return compiled, False
+
+    digest = _file_digest(csv_path)
+    rebuilt = not (compiled and compiled["sha1"] == digest)
+    if rebuilt:
+        compiled = {
+            "version": CACHE_FORMAT_VERSION,
+            "source": os.path.basename(csv_path),
+            "sha1": digest,
+            "questions": parse_questions_from_csv(csv_path),
+        }
+    compiled["size"] = stat.st_size
+    compiled["mtime_ns"] = stat.st_mtime_ns
+
+    try:
+        _write_compiled(cache_path, compiled)
+    except OSError as e:
+        print(f"[WARNING] Could not write compiled bank {cache_path}: {e}")
+    return compiled, rebuilt
+
+
+def compile_bank(csv_path: str, cache_dir: Optional[str] = None) -> bool:
+    """
+    Make sure the compiled bank for csv_path is current.
+    Returns True if the CSV had to be parsed again.
+    """
+    return _ensure_compiled(csv_path, cache_dir)[1]
+
+
+def compile_banks(csv_paths: List[str], cache_dir: Optional[str] = None) -> List[str]:
+    """
+    Compile every bank in csv_paths, rebuilding only those whose CSV changed.
+    Returns the paths that were rebuilt.
+    """
+    return [path for path in csv_paths if compile_bank(path, cache_dir)]
+
+
+def load_compiled_bank(csv_path: str, cache_dir: Optional[str] = None) -> List[Dict]:
+    """
+    Load the parsed questions for csv_path from its compiled bank,
+    rebuilding the bank first if the CSV changed since it was compiled.
+    """
+    return _ensure_compiled(csv_path, cache_dir)[0]["questions"]
+
+
+def domain_from_path(csv_path: str) -> str:
+    """
+    Domain key for a bank file, e.g. "domain_Domain 1_ SDLC Automation11.csv" -> "Domain 1".
+    Files that do not follow the naming scheme are keyed by their file name.
+    """
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    match = re.search(r'Domain\s*(\d+)', stem, re.IGNORECASE)
+    if match:
+        return f"Domain {int(match.group(1))}"
+    return stem
+
+
+def discover_banks(root: str) -> Dict[str, List[str]]:
+    """
+    Find every CSV under root and group the files by domain.
+    """
+    banks: Dict[str, List[str]] = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != CACHE_DIR_NAME)
+        for filename in sorted(filenames):
+            if filename.lower().endswith(".csv"):
+                path = os.path.join(dirpath, filename)
+                banks.setdefault(domain_from_path(path), []).append(path)
+    return dict(sorted(banks.items()))
+
+
+class BankRegistry:
+    """
+    Index of every question bank under a folder, keyed by domain.
+
+    Banks are compiled up front (in parallel), but a domain's questions are only loaded into memory
+    the first time an exam asks for it. Loaded domains are kept in LRU order and the least recently
+    used ones are dropped once more than max_resident_questions questions are resident.
+    If prepare is given it is called once with each domain's questions right after they are loaded,
+    so callers can attach anything derived from the static question content.
+    """
+
+    def __init__(self, root: str, max_resident_questions: int = 5000, workers: Optional[int] = None,
+                 prepare: Optional[Callable[[List[Dict]], None]] = None):
+        self.root = root
+        self.prepare = prepare
+        self.max_resident_questions = max_resident_questions
+        self.workers = workers
+        self.sources = discover_banks(root)
+        self._resident: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        # Domains loaded by preload(); never evicted, and not counted against the budget
+        self._pinned: Set[str] = set()
+        # Per-domain answer key: one mask byte per question
+        self._answer_keys: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def domains(self) -> List[str]:
+        return list(self.sources)
+
+    def compile_all(self) -> List[str]:
+        """
+        Parse every changed CSV in a process pool so later loads hit the compiled banks.
+        Returns the paths that were rebuilt.
+        """
+        paths = [path for domain_paths in self.sources.values() for path in domain_paths]
+        if len(paths) <= 1 or self.workers == 1:
+            return compile_banks(paths)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            rebuilt = pool.map(compile_bank, paths)
+        return [path for path, was_rebuilt in zip(paths, rebuilt) if was_rebuilt]
+
+    def resident_domains(self) -> List[str]:
+        with self._lock:
+            return list(self._resident)
+
+    def get(self, domain: str) -> List[Dict]:
+        """
+        Questions for domain, loading them on first use.
+        """
+        with self._lock:
+            if domain in self._resident:
+                self._resident.move_to_end(domain)
+                return self._resident[domain]
+
+        if domain not in self.sources:
+            raise KeyError(f"Unknown domain: {domain}")
+
+        questions = []
+        for path in self.sources[domain]:
+            for question in load_compiled_bank(path):
+                question["domain"] = domain
+                questions.append(question)
+        if self.prepare is not None:
+            self.prepare(questions)
+
+        answer_key = bytes(q["answer_mask"] for q in questions)
+
+        with self._lock:
+            self._resident[domain] = questions
+            self._answer_keys[domain] = answer_key
+            self._resident.move_to_end(domain)
+            self._evict()
+        return questions
+
+    def preload(self, domains: Optional[List[str]] = None) -> int:
+        """
+        Load domains (default: all) into memory up front, e.g. in a server's master process before
+        workers fork so they share the pages copy-on-write. Preloaded domains are pinned: they are never
+        evicted and do not count against max_resident_questions, which still bounds the other domains.
+        Returns the number of questions loaded.
+        """
+        domains = self.domains() if domains is None else domains
+        total = 0
+        for domain in domains:
+            questions = self.get(domain)
+            with self._lock:
+                self._pinned.add(domain)
+            total += len(questions)
+        return total
+
+    def answer_key(self, domain: str) -> bytes:
+        """
+        Precomputed answer masks for domain, one byte per question, built when it was loaded.
+        """
+        questions = self.get(domain)
+        with self._lock:
+            answer_key = self._answer_keys.get(domain)
+        if answer_key is None:
+            # Evicted again between the two lookups; rebuild from the questions we already hold
+            answer_key = bytes(q["answer_mask"] for q in questions)
+        return answer_key
+
+    def _evict(self) -> None:
+        # Always keep the most recently requested domain, even if it alone exceeds the budget.
+        # Pinned (preloaded) domains are skipped and not counted.
+        unpinned = [domain for domain in self._resident if domain not in self._pinned]
+        resident = sum(len(self._resident[domain]) for domain in unpinned)
+        for domain in unpinned[:-1]:
+            if resident <= self.max_resident_questions:
+                break
+            resident -= len(self._resident.pop(domain))
+            self._answer_keys.pop(domain, None)
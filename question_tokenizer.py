@@ -0,0 +1,62 @@
+from typing import List, Tuple
+
+
+def _option_letter_at(text: str, pos: int) -> str:
+    # "X." at pos, where X is an uppercase letter; returns X or ""
+    if pos + 1 < len(text) and text[pos + 1] == "." and "A" <= text[pos] <= "Z":
+        return text[pos]
+    return ""
+
+
+def tokenize_question(text: str) -> Tuple[str, List[str]]:
+    """
+    Split a question block into its stem and lettered options in one forward scan.
+
+    Options start on a new line with "A.", "B.", ... and must appear in order. An option runs until
+    the line that starts the next letter, so option text may span several lines, and a line that merely
+    starts with another capital and a dot (e.g. "X. ...") inside an option is kept as part of it.
+    Every option is returned, even past answer_codec.MAX_OPTIONS (H); callers reject such questions.
+    Options keep their "X." prefix, e.g.
+    "Which?\\nA. one\\nB. two" -> ("Which?", ["A. one", "B. two"]).
+    """
+    options: List[str] = []
+    stem_end = len(text)
+    option_start = -1
+    expected = "A"
+
+    pos = text.find("\n")
+    while pos != -1:
+        line_start = pos + 1
+        letter = _option_letter_at(text, line_start)
+        if letter and letter == expected:
+            if option_start == -1:
+                stem_end = pos
+            else:
+                options.append(text[option_start:pos].rstrip())
+            option_start = line_start
+            expected = chr(ord(expected) + 1)
+        pos = text.find("\n", line_start)
+
+    if option_start != -1:
+        options.append(text[option_start:].rstrip())
+    return text[:stem_end], options
+
+
+def option_letters(options: List[str]) -> str:
+    """
+    ["A. one", "B. two"] -> "AB"
+    """
+    return "".join(option[0] for option in options if option)
+
+
+def normalize_answer(answer: str, options: List[str]) -> str:
+    """
+    Bare answer letters for a question with these options, e.g. "b, d" -> "BD".
+    Returns "" if the answer names no letter or a letter that is not one of the options
+    (e.g. "B. AWS CodeBuild").
+    """
+    letters = [c.upper() for c in answer if c.isalpha()]
+    valid = option_letters(options)
+    if not letters or any(letter not in valid for letter in letters):
+        return ""
+    return "".join(sorted(set(letters)))
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = "extraction_cache.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def cache_key(image_bytes: bytes, prompt: str, model_id: str, max_tokens: int, variant: str = "") -> str:
+    """
+    Content address of one extraction request: SHA-256 over the image bytes and every request
+    parameter that can change the model's answer. variant covers anything else that changes what
+    is sent for the same source bytes (e.g. image preprocessing settings).
+    """
+    digest = hashlib.sha256()
+    parts = [image_bytes, prompt.encode("utf-8"), model_id.encode("utf-8"), str(max_tokens).encode("ascii")]
+    if variant:
+        parts.append(variant.encode("utf-8"))
+    for part in parts:
+        # Length-prefix each part so different splits of the same bytes never collide
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent cache of model responses keyed by cache_key(), stored in a local SQLite file.
+
+    Entries older than max_age_seconds are treated as misses and removed by evict(), which also
+    trims the cache to the max_entries most recently used responses. Hit/miss counts are kept
+    for the lifetime of the object; a key looked up and missed several times (e.g. a batched image
+    that falls back to a single request) counts as one miss.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, max_entries: Optional[int] = None,
+                 max_age_seconds: Optional[float] = None):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self._missed = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; extraction runs on a thread pool
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._connect()
+        row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is not None and (self.max_age_seconds is None or now - row[1] <= self.max_age_seconds):
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            with self._lock:
+                self.hits += 1
+            return row[0]
+        with self._lock:
+            self._missed.add(key)
+        return None
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO responses (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+            (key, response, now, now)
+        )
+
+    def evict(self) -> int:
+        """
+        Drop expired entries and trim to max_entries. Returns the number of entries removed.
+        """
+        conn = self._connect()
+        removed = 0
+        if self.max_age_seconds is not None:
+            removed += conn.execute("DELETE FROM responses WHERE created_at < ?",
+                                    (time.time() - self.max_age_seconds,)).rowcount
+        if self.max_entries is not None:
+            removed += conn.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            ).rowcount
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": len(self._missed)}
@@ -0,0 +1,37 @@
+import base64
+from typing import Dict
+
+import numpy as np
+
+
+def decode_submission(blob: str, n_questions: int) -> np.ndarray:
+    """
+    Answers blob (see answer_codec.py) -> uint8 array of selection masks, one per question.
+    """
+    submitted = np.zeros(n_questions, dtype=np.uint8)
+    if blob:
+        raw = np.frombuffer(base64.b64decode(blob), dtype=np.uint8)[:n_questions]
+        submitted[:len(raw)] = raw
+    return submitted
+
+
+def grade_submission(answer_masks: bytes, blob: str) -> Dict:
+    """
+    Grade a whole submission in one step.
+
+    answer_masks holds one precomputed correct-answer mask per question and blob is the session's
+    answers; a question is correct when its masks match exactly.
+    """
+    key = np.frombuffer(answer_masks, dtype=np.uint8)
+    submitted = decode_submission(blob, len(key))
+    correct = submitted == key
+    score = int(np.count_nonzero(correct))
+    total = len(key)
+
+    return {
+        "score": score,
+        "total": total,
+        "percentage": score / total * 100 if total else 0.0,
+        "submitted": submitted,
+        "correct": correct,
+    }
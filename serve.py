@@ -0,0 +1,102 @@
+"""
+Production server for dash_app.py.
+
+Question banks are compiled and loaded once in the master process, before the workers fork, so
+every worker shares the same copy-on-write pages. Exam state lives in the SQLite session store,
+so any worker can answer any request.
+
+python serve.py --bind 0.0.0.0:8050 --workers 8
+python serve.py --domain "Domain 1" --domain "Domain 3" --banks-dir domainQuestions
+Plain `gunicorn --preload dash_app:server` also works, but then each worker loads banks lazily on first use.
+"""
+import argparse
+import gc
+import os
+
+
+def load_app(domains=None):
+    """
+    Import the app, compile changed banks and load the selected domains into memory.
+    Returns the WSGI server object.
+    """
+    import dash_app
+
+    rebuilt = dash_app.registry.compile_all()
+    if rebuilt:
+        print(f"Compiled {len(rebuilt)} changed question bank(s)")
+    loaded = dash_app.registry.preload(domains or None)
+    print(f"Preloaded {loaded} questions from {', '.join(domains or dash_app.registry.domains())}")
+
+    # Move everything loaded so far out of the GC's tracked generations; otherwise the first
+    # collection in each worker touches every object and un-shares the copy-on-write pages.
+    gc.freeze()
+    return dash_app.server
+
+
+def serve_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class ExamApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", args.bind)
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("threads", args.threads)
+            # Load the app in the master so the banks are shared by every forked worker
+            self.cfg.set("preload_app", True)
+            self.cfg.set("timeout", args.timeout)
+
+        def load(self):
+            return load_app(args.domain)
+
+    ExamApplication().run()
+
+
+def serve_waitress(args):
+    # gunicorn does not run on Windows; waitress serves from a single process with a thread pool
+    try:
+        from waitress import serve
+    except ImportError:
+        raise SystemExit("Install a WSGI server first: pip install gunicorn (Linux/macOS) or pip install waitress (Windows)")
+
+    print("[WARNING] gunicorn not available; serving from one process with waitress")
+    host, _, port = args.bind.rpartition(":")
+    serve(load_app(args.domain), host=host or "0.0.0.0", port=int(port), threads=args.workers * args.threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the exam app with multiple workers")
+    parser.add_argument("--bind", default="0.0.0.0:8050", help="host:port to listen on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="threads per worker")
+    parser.add_argument("--timeout", type=int, default=60, help="worker timeout in seconds")
+    parser.add_argument("--banks-dir", help="folder with the question bank CSVs (default: domainQuestions beside dash_app.py)")
+    parser.add_argument("--domain", action="append",
+                        help="domain to preload, repeatable (default: every domain found)")
+    parser.add_argument("--session-db", help="SQLite file for exam sessions (default: ./exam_sessions.db)")
+    args = parser.parse_args()
+
+    # dash_app reads these at import time
+    if args.banks_dir:
+        os.environ["EXAM_BANKS_DIR"] = os.path.abspath(args.banks_dir)
+    if args.domain:
+        from question_bank import DEFAULT_BANKS_DIR, discover_banks
+
+        banks_dir = os.environ.get("EXAM_BANKS_DIR", DEFAULT_BANKS_DIR)
+        domains = list(discover_banks(banks_dir))
+        unknown = [domain for domain in args.domain if domain not in domains]
+        if unknown:
+            parser.error(f"unknown domain(s) {', '.join(map(repr, unknown))} in {banks_dir}; "
+                         f"choose from: {', '.join(map(repr, domains)) or 'none found'}")
+    if args.session_db:
+        os.environ["EXAM_SESSION_DB"] = os.path.abspath(args.session_db)
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        serve_waitress(args)
+    else:
+        serve_gunicorn(args)
+
+
+if __name__ == "__main__":
+    main()
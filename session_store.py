@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from answer_codec import set_answer
+
+DEFAULT_DB_PATH = "exam_sessions.db"
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+# How often (at most) expired rows are deleted from the SQLite file.
+PURGE_INTERVAL_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    answers TEXT NOT NULL DEFAULT '',
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+"""
+
+
+class SessionStore:
+    """
+    Server-side exam state keyed by session id.
+
+    Sessions are persisted in a local SQLite file (WAL mode), so every worker process on the host
+    sees the same state. Each process keeps an in-memory LRU of recently used sessions; a cached
+    entry is only trusted while its version matches the row in SQLite, so writes made by another
+    worker are picked up on the next read. Sessions idle for longer than ttl_seconds are dropped
+    from the cache and deleted from the database.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_cached: int = 1024):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_purge = 0.0
+        # Schema setup uses a throwaway connection so nothing is open when worker processes fork
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread, reopened after a fork so workers never share a handle.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _remember(self, session: Dict) -> Dict:
+        with self._lock:
+            self._cache[session["id"]] = session
+            self._cache.move_to_end(session["id"])
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return session
+
+    def _forget(self, session_id: str) -> None:
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+    def create(self, domain: str) -> Dict:
+        """
+        Start a new exam session for domain.
+        """
+        now = time.time()
+        session = {
+            "id": uuid.uuid4().hex,
+            "domain": domain,
+            "answers": "",
+            "started_at": now,
+            "updated_at": now,
+            "version": 0,
+        }
+        self._connect().execute(
+            "INSERT INTO sessions (id, domain, answers, started_at, updated_at, version) VALUES (?, ?, ?, ?, ?, ?)",
+            (session["id"], domain, "", now, now, 0)
+        )
+        self._maybe_purge()
+        return self._remember(session)
+
+    def get(self, session_id: Optional[str]) -> Optional[Dict]:
+        """
+        The session, or None if it does not exist or has expired.
+        """
+        if not session_id:
+            return None
+        conn = self._connect()
+        row = conn.execute("SELECT version, updated_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None or time.time() - row["updated_at"] > self.ttl_seconds:
+            self._forget(session_id)
+            return None
+
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is not None and cached["version"] == row["version"]:
+                self._cache.move_to_end(session_id)
+                return cached
+
+        row = conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            self._forget(session_id)
+            return None
+        return self._remember(dict(row))
+
+    def set_answer(self, session_id: str, index: int, mask: int, n_questions: Optional[int] = None) -> Optional[Dict]:
+        """
+        Record the selection mask for one question. Only this delta crosses the wire;
+        the read-modify-write runs in one IMMEDIATE transaction so concurrent workers do not lose updates.
+        Returns None if the session does not exist or has expired. The index comes from the browser, so
+        it must lie in [0, n_questions) (ValueError otherwise); without n_questions only negatives are refused.
+        """
+        if index < 0 or (n_questions is not None and index >= n_questions):
+            raise ValueError(f"Question index out of range: {index}")
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None or time.time() - row["updated_at"] > self.ttl_seconds:
+                # An expired row must not be brought back to life by a late click
+                conn.execute("ROLLBACK")
+                self._forget(session_id)
+                return None
+            session = dict(row)
+            session["answers"] = set_answer(session["answers"], index, mask)
+            session["updated_at"] = time.time()
+            session["version"] += 1
+            conn.execute(
+                "UPDATE sessions SET answers = ?, updated_at = ?, version = ? WHERE id = ?",
+                (session["answers"], session["updated_at"], session["version"], session_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self._remember(session)
+
+    def purge_expired(self) -> int:
+        """
+        Delete sessions idle for longer than the TTL. Returns the number of rows removed.
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            for session_id in [k for k, v in self._cache.items() if v["updated_at"] < cutoff]:
+                del self._cache[session_id]
+        cursor = self._connect().execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+        self._last_purge = time.time()
+        return cursor.rowcount
+
+    def _maybe_purge(self) -> None:
+        if time.time() - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
@@ -0,0 +1,77 @@
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Bedrock error codes worth retrying: the request was fine, the service was busy
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+
+
+class RateLimiter:
+    """
+    Client-side token bucket shared by all extraction threads.
+    Allows `rate` calls per second on average with bursts of up to `burst` calls.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def error_code(error: Exception) -> Optional[str]:
+    """
+    AWS error code of a botocore ClientError (e.g. "ThrottlingException"), falling back to the class name.
+    """
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code")
+        if code:
+            return code
+    return type(error).__name__
+
+
+def is_retryable(error: Exception) -> bool:
+    return error_code(error) in RETRYABLE_ERROR_CODES
+
+
+def call_with_backoff(fn: Callable[[], T], max_retries: int = 5, base_delay: float = 1.0,
+                      max_delay: float = 30.0, on_retry: Optional[Callable[[int, Exception, float], None]] = None) -> T:
+    """
+    Call fn, retrying throttling errors with exponential backoff and full jitter:
+    attempt n sleeps a random time in [0, min(max_delay, base_delay * 2**n)].
+    Other errors, and the last throttling error once retries run out, are raised.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            if on_retry is not None:
+                on_retry(attempt + 1, e, delay)
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,261 @@
+import argparse
+import collections
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple
+
+import cv2
+
+from bank_ingest import DEFAULT_THRESHOLD, ingest
+from capture_images import (choose_capture_mode, get_capture_times, iter_frames, iter_slides,
+                            probe_keyframe_interval, timed)
+from domain_classifier import DomainClassifier
+from extraction_metrics import ExtractionMetrics
+from extraction_output import StreamingResultWriter
+from image_extractor import PROMPT, CostReport, process_image
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache
+from throttling import RateLimiter
+
+# Marks the end of the decoded frames on the frame queue
+_DONE = object()
+
+
+def encode_frame(frame, quality: int = 90, max_dimension: Optional[int] = None) -> bytes:
+    """
+    JPEG-encode a decoded frame in memory, first downscaling it so the longest side is at most max_dimension.
+    """
+    height, width = frame.shape[:2]
+    if max_dimension and max(height, width) > max_dimension:
+        scale = max_dimension / max(height, width)
+        frame = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("could not encode frame as JPEG")
+    return buffer.tobytes()
+
+
+def iter_video_frames(video, video_path: str, slides: bool = True, start_minute: int = 1, start_second: int = 15,
+                      interval_minutes: int = 1, timings: Optional[Dict] = None) -> Iterator[Tuple[float, object]]:
+    """
+    Yield (seconds, frame) from an open capture: one frame per slide (capture_images.iter_slides),
+    or the frames of the fixed capture schedule read in seek or scan mode, whichever suits the video.
+    """
+    timings = timings if timings is not None else {"decode_seconds": 0.0}
+    if slides:
+        yield from iter_slides(video, timings=timings)
+        return
+
+    fps = video.get(cv2.CAP_PROP_FPS)
+    total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture_times = get_capture_times(total_frames / fps, start_minute, start_second, interval_minutes)
+    frame_numbers = [int(capture_time * fps) for capture_time in capture_times]
+    mode = choose_capture_mode(frame_numbers, probe_keyframe_interval(video_path))
+    for capture_time, (_, frame) in zip(capture_times, timed(iter_frames(video, frame_numbers, mode), timings)):
+        if frame is None:
+            print(f"Failed to capture at {capture_time:.2f} seconds")
+            continue
+        yield capture_time, frame
+
+
+def iter_encoded_frames(video_path: str, quality: int = 90, max_dimension: Optional[int] = None,
+                        max_queue: int = 8, timings: Optional[Dict] = None,
+                        **capture_options) -> Iterator[Tuple[str, float, bytes]]:
+    """
+    Decode and JPEG-encode frames on a background thread and yield (name, seconds, jpeg bytes) as
+    they become ready. The thread runs ahead by at most max_queue frames, so memory stays bounded
+    while the consumer is busy. capture_options go to iter_video_frames. An error while decoding
+    is raised in the consumer.
+    """
+    timings = timings if timings is not None else {}
+    timings.update({"decode_seconds": 0.0, "encode_seconds": 0.0, "blocked_seconds": 0.0, "frames": 0, "bytes": 0})
+    frames: queue.Queue = queue.Queue(maxsize=max(max_queue, 1))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        start = time.perf_counter()
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                timings["blocked_seconds"] += time.perf_counter() - start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        video = cv2.VideoCapture(video_path)
+        try:
+            if not video.isOpened():
+                raise IOError(f"Could not open video: {video_path}")
+            for seconds, frame in iter_video_frames(video, video_path, timings=timings, **capture_options):
+                start = time.perf_counter()
+                data = encode_frame(frame, quality, max_dimension)
+                timings["encode_seconds"] += time.perf_counter() - start
+                timings["frames"] += 1
+                timings["bytes"] += len(data)
+                if not put((f"frame_{timings['frames']:03d}.jpg", seconds, data)):
+                    return
+            put(_DONE)
+        except Exception as e:
+            put(e)
+        finally:
+            video.release()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = frames.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # The consumer stopped early (or failed): let the decoder thread exit instead of blocking on a full queue
+        stop.set()
+        thread.join()
+
+
+def iter_extracted(frames: Iterator[Tuple[str, float, bytes]], concurrency: int = 4,
+                   requests_per_second: Optional[float] = None, max_retries: int = 5, client=None,
+                   cache: Optional[ResponseCache] = None, report: Optional[CostReport] = None,
+                   metrics: Optional[ExtractionMetrics] = None) -> Iterator[Tuple[str, float, Dict[str, str]]]:
+    """
+    Extract the question from each (name, seconds, jpeg bytes) frame and yield (name, seconds, result)
+    in frame order. Up to `concurrency` frames are being extracted while the next ones are decoded;
+    at most twice that many are held, so a slow model does not let decoded frames pile up.
+    """
+    classifier = DomainClassifier()
+    prompt = str(PROMPT)
+    rate_limiter = RateLimiter(requests_per_second, burst=concurrency) if requests_per_second else None
+    concurrency = max(concurrency, 1)
+
+    def run(name, data):
+        record = metrics.start(name) if metrics is not None else None
+        result = process_image(name, name, prompt, client=client, max_retries=max_retries,
+                               rate_limiter=rate_limiter, cache=cache, report=report,
+                               classifier=classifier, record=record, image_bytes=data)
+        if record is not None:
+            metrics.finish(record, result)
+        return result
+
+    in_flight = collections.deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, seconds, data in frames:
+            in_flight.append((name, seconds, pool.submit(run, name, data)))
+            while len(in_flight) >= 2 * concurrency or (in_flight and in_flight[0][2].done()):
+                name, seconds, future = in_flight.popleft()
+                yield name, seconds, future.result()
+        while in_flight:
+            name, seconds, future = in_flight.popleft()
+            yield name, seconds, future.result()
+
+
+def run_pipeline(video_path: str, banks_dir: str, concurrency: int = 4, requests_per_second: Optional[float] = None,
+                 max_retries: int = 5, client=None, cache: Optional[ResponseCache] = None,
+                 quality: int = 90, max_dimension: Optional[int] = None, max_queue: int = 8,
+                 output: Optional[str] = None, threshold: float = DEFAULT_THRESHOLD, dry_run: bool = False,
+                 metrics: Optional[ExtractionMetrics] = None, report: Optional[CostReport] = None,
+                 **capture_options) -> Dict:
+    """
+    Turn a lecture video straight into new questions in the per-domain banks under banks_dir.
+
+    Decoding and JPEG encoding run on one thread, extraction on a pool of `concurrency` threads and
+    bank writes on the calling thread, so the three stages overlap; frames are only ever held in
+    memory. With output, every result is also logged by a StreamingResultWriter (CSV, .jsonl, errors).
+    metrics and report (token usage and latency per request) are filled in as frames are extracted.
+    Returns the bank_ingest report with the stage timings added under "timings".
+    """
+    timings: Dict = {}
+    start = time.perf_counter()
+    frames = iter_encoded_frames(video_path, quality=quality, max_dimension=max_dimension, max_queue=max_queue,
+                                 timings=timings, **capture_options)
+    extracted = iter_extracted(frames, concurrency=concurrency, requests_per_second=requests_per_second,
+                               max_retries=max_retries, client=client, cache=cache, report=report,
+                               metrics=metrics)
+    writer = StreamingResultWriter(output) if output else None
+
+    def successful():
+        for name, seconds, result in extracted:
+            if writer is not None:
+                writer.write(name, result)
+            if 'error' not in result:
+                yield {**result, 'image': name, 'seconds': round(seconds, 2)}
+
+    try:
+        merged = ingest(successful(), banks_dir, threshold=threshold, dry_run=dry_run)
+    finally:
+        if writer is not None:
+            writer.close()
+    timings["elapsed_seconds"] = time.perf_counter() - start
+    merged["timings"] = timings
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract exam questions from a lecture video into the question banks")
+    parser.add_argument("video", help="video file")
+    parser.add_argument("--banks-dir", default="domainQuestions", help="folder of per-domain bank CSVs")
+    parser.add_argument("--schedule", action="store_true",
+                        help="capture at fixed times (--start-minute/--start-second/--interval-minutes) "
+                             "instead of once per detected slide")
+    parser.add_argument("--start-minute", type=int, default=1)
+    parser.add_argument("--start-second", type=int, default=15)
+    parser.add_argument("--interval-minutes", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=4, help="frames being extracted at once")
+    parser.add_argument("--rps", type=float, help="max Bedrock requests per second across all threads")
+    parser.add_argument("--max-retries", type=int, default=5, help="retries per frame on throttling")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="SQLite file for cached model responses")
+    parser.add_argument("--no-cache", action="store_true", help="always call the model")
+    parser.add_argument("--cache-max-entries", type=int, help="keep at most this many cached responses")
+    parser.add_argument("--cache-max-age-days", type=float, help="ignore and drop cached responses older than this")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG quality of the uploaded frames")
+    parser.add_argument("--max-dimension", type=int, help="downscale frames so the longest side is at most this")
+    parser.add_argument("--frame-queue", type=int, default=8, help="encoded frames buffered before decoding waits")
+    parser.add_argument("--output", help="also log every result to this CSV (with .jsonl and .errors.jsonl next to it)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="estimated Jaccard similarity at which a question counts as a near duplicate")
+    parser.add_argument("--dry-run", action="store_true", help="extract and report, but do not write to the banks")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.video):
+        parser.error(f"video not found: {args.video}")
+    cache = None
+    if not args.no_cache:
+        max_age = args.cache_max_age_days * 86400 if args.cache_max_age_days else None
+        cache = ResponseCache(args.cache, max_entries=args.cache_max_entries, max_age_seconds=max_age)
+    metrics = ExtractionMetrics()
+    cost_report = CostReport()
+    try:
+        report = run_pipeline(args.video, args.banks_dir, concurrency=args.concurrency, requests_per_second=args.rps,
+                              max_retries=args.max_retries, cache=cache, quality=args.quality,
+                              max_dimension=args.max_dimension, max_queue=args.frame_queue, output=args.output,
+                              threshold=args.threshold, dry_run=args.dry_run, metrics=metrics, report=cost_report,
+                              slides=not args.schedule, start_minute=args.start_minute,
+                              start_second=args.start_second, interval_minutes=args.interval_minutes)
+    except IOError as e:
+        print(f"[ERROR] {e}")
+        raise SystemExit(1)
+
+    for bank, count in report["added"].items():
+        print(f"[SUCCESS] {'Would add' if args.dry_run else 'Added'} {count} questions to {bank}")
+    print(f"{sum(report['added'].values())} added, {len(report['duplicates'])} duplicates, "
+          f"{len(report['rejected'])} rejected")
+    timings = report["timings"]
+    print(f"{timings['frames']} frames in {timings['elapsed_seconds']:.2f}s: decode {timings['decode_seconds']:.2f}s, "
+          f"encode {timings['encode_seconds']:.2f}s ({timings['bytes'] / 1e6:.1f} MB, never written to disk), "
+          f"decoding waited {timings['blocked_seconds']:.2f}s on a full frame queue")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses")
+    cost_report.print_summary()
+    metrics.print_summary()
+
+    if cache is not None:
+        removed = cache.evict()
+        if removed:
+            print(f"Evicted {removed} cached responses")